@@ -0,0 +1,184 @@
+"""
+4PLAY - Columnar Artifact Archive
+Compacts each day's Phase 1-4 JSON files (odds_, matched_games_, results_,
+evaluated_bets_) into one compressed numpy partition per (kind, date), with
+string columns dictionary-encoded, and reads back only the columns and dates asked for
+
+Usage: python archive.py [--remove-source]  (run after the evening pipeline)
+       read('odds', ['match', 'market', 'odd'], start='2025-11-01') from Python
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+# Paths
+ODDS_DIR = Path("C:/Users/35844/Parlay/odds")
+FLASH_URLS_DIR = Path("C:/Users/35844/Parlay/Flash_URLs")
+ARCHIVE_DIR = Path("C:/Users/35844/Parlay/archive")
+SOURCE_DIRS = {
+    'odds': ODDS_DIR / "Scraped_odds_json",
+    'matched_games': FLASH_URLS_DIR / "URL_matching_data",
+    'results': FLASH_URLS_DIR / "Results_and_Evaluations",
+    'evaluated_bets': FLASH_URLS_DIR / "Results_and_Evaluations",
+}
+
+DICT_SUFFIX = "__dict"
+SOURCE_COLUMN = "source"  # Artifact file each row came from (e.g. to find closing odds)
+SOURCES_KEY = "__sources"  # Files a partition was built from
+MISSING = -1  # Code for a missing string value
+FILE_DATE = re.compile(r'(\d{4})-?(\d{2})-?(\d{2})')
+
+
+def artifact_date(path: Path) -> str | None:
+    """YYYY-MM-DD from an artifact's timestamped name"""
+    found = FILE_DATE.search(path.stem)
+    return "-".join(found.groups()) if found else None
+
+
+def find_artifacts(kind: str, source_dir: Path) -> dict[str, list[Path]]:
+    """Artifact files of one kind, grouped by date"""
+    by_date = {}
+    for path in sorted(source_dir.glob(f"{kind}_*.json")):
+        date_str = artifact_date(path)
+        if date_str:
+            by_date.setdefault(date_str, []).append(path)
+    return by_date
+
+
+def encode_column(values: list) -> dict[str, np.ndarray]:
+    """Numbers as float64 (NaN if missing), everything else dictionary-encoded"""
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return {'': np.array([np.nan if v is None else v for v in values], dtype=np.float64)}
+
+    # Nested values (score dicts, period lists) are kept as JSON text
+    texts = [v if v is None or isinstance(v, str) else json.dumps(v, ensure_ascii=False) for v in values]
+    dictionary = sorted({t for t in texts if t is not None})
+    index = {text: code for code, text in enumerate(dictionary)}
+    codes = np.array([MISSING if t is None else index[t] for t in texts], dtype=np.int32)
+    return {'': codes, DICT_SUFFIX: np.array(dictionary, dtype=np.str_)}
+
+
+def compact_partition(paths: list[Path], out_path: Path) -> int:
+    """Write one partition from a day's artifact files; returns its row count"""
+    rows = []
+    sources = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        rows.extend(records)
+        sources.extend([path.name] * len(records))
+
+    columns = {}
+    for row in rows:
+        for key in row:
+            columns.setdefault(key, None)
+
+    arrays = {SOURCES_KEY: np.array([p.name for p in paths], dtype=np.str_)}
+    for column in list(columns) + [SOURCE_COLUMN]:
+        values = sources if column == SOURCE_COLUMN else [row.get(column) for row in rows]
+        for suffix, array in encode_column(values).items():
+            arrays[column + suffix] = array
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_suffix(".tmp")
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, out_path)
+    return len(rows)
+
+
+def compact(archive_dir: Path = ARCHIVE_DIR, source_dirs: dict = SOURCE_DIRS, remove_source: bool = False) -> dict:
+    """Compact every day whose files aren't archived yet (or changed); returns rows written per kind"""
+    today_str = date.today().isoformat()
+    written = {}
+    for kind, source_dir in source_dirs.items():
+        written[kind] = 0
+        for date_str, paths in find_artifacts(kind, source_dir).items():
+            out_path = archive_dir / kind / f"{date_str}.npz"
+            if not out_path.exists() or archived_sources(out_path) != [p.name for p in paths]:
+                count = compact_partition(paths, out_path)
+                written[kind] += count
+                print(f"   📦 {kind} {date_str}: {count} rows from {len(paths)} files")
+
+            # Today's files are still read by the pipelines (latest odds, --resume checksums)
+            if remove_source and date_str < today_str and archived_sources(out_path) == [p.name for p in paths]:
+                for path in paths:
+                    path.unlink()
+    return written
+
+
+def archived_sources(path: Path) -> list[str]:
+    """Names of the artifact files a partition was built from"""
+    with np.load(path) as partition:
+        return partition[SOURCES_KEY].tolist()
+
+
+def partitions(kind: str, start: str | None = None, end: str | None = None,
+               archive_dir: Path = ARCHIVE_DIR) -> list[Path]:
+    """Partition files of one kind between start and end dates (inclusive)"""
+    return [
+        path for path in sorted((archive_dir / kind).glob("*.npz"))
+        if (start is None or path.stem >= start) and (end is None or path.stem <= end)
+    ]
+
+
+def read(kind: str, columns: list[str] | None = None, start: str | None = None, end: str | None = None,
+         archive_dir: Path = ARCHIVE_DIR) -> dict[str, np.ndarray]:
+    """Load columns of one kind across a date range
+
+    Only the requested columns are decompressed. Strings come back as object
+    arrays (None where missing), numbers as float64; a 'date' column holds the
+    partition date unless the artifacts had their own.
+    """
+    paths = partitions(kind, start, end, archive_dir)
+    if columns is None:
+        # Union of every partition's columns (listing a partition doesn't decompress it)
+        columns = {}
+        for path in paths:
+            with np.load(path) as partition:
+                for key in partition.files:
+                    if key != SOURCES_KEY and not key.endswith(DICT_SUFFIX):
+                        columns.setdefault(key, None)
+        columns = list(columns) + (['date'] if 'date' not in columns else [])
+
+    chunks = {}
+    for path in paths:
+        with np.load(path) as partition:
+            n = len(partition[SOURCE_COLUMN])
+            for column in columns:
+                if column in partition.files:
+                    values = partition[column]
+                    if column + DICT_SUFFIX in partition.files:
+                        dictionary = np.append(partition[column + DICT_SUFFIX].astype(object), None)
+                        values = dictionary[values]  # MISSING (-1) picks the trailing None
+                elif column == 'date':
+                    values = np.full(n, path.stem, dtype=object)
+                else:
+                    values = np.full(n, None, dtype=object)
+                chunks.setdefault(column, []).append(values)
+
+    return {column: np.concatenate(parts) for column, parts in chunks.items()}
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="Compact daily pipeline artifacts into the columnar archive")
+    parser.add_argument("--archive", type=Path, default=ARCHIVE_DIR, help="Archive directory")
+    parser.add_argument("--remove-source", action="store_true", help="Delete archived JSON files from before today")
+    args = parser.parse_args()
+
+    print(f"🗄️  Compacting artifacts into {args.archive}...")
+    written = compact(args.archive, remove_source=args.remove_source)
+    print("✅ Archive up to date: " + ", ".join(f"{count} {kind} rows" for kind, count in written.items()))
+
+
+if __name__ == "__main__":
+    main()
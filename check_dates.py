@@ -2,18 +2,15 @@ import sys
 import io
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
-from dotenv import load_dotenv
-import os
-from supabase import create_client
+from mirror import open_mirror
 from datetime import datetime
 
-load_dotenv()
-supabase = create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_SERVICE_KEY'))
+db = open_mirror()
 
 # Get sample games
-games = supabase.table('games').select('date, match').limit(5).execute()
+games = db.execute('SELECT date, match FROM games LIMIT 5').fetchall()
 print('Sample dates in database:')
-for g in games.data:
+for g in games:
     print(f'  {g["date"]} - {g["match"][:50]}')
 
 # Check what JavaScript would query
@@ -21,10 +18,9 @@ today_js = datetime.now().date().isoformat()
 print(f'\nJavaScript query would use: {today_js}')
 
 # Check how many games match today
-today_games = supabase.table('games').select('id', count='exact').eq('date', today_js).execute()
-print(f'\nGames matching "{today_js}": {today_games.count}')
+today_games = db.execute('SELECT COUNT(*) FROM games WHERE date = ?', (today_js,)).fetchone()[0]
+print(f'\nGames matching "{today_js}": {today_games}')
 
 # Check all unique dates in database
-all_games = supabase.table('games').select('date').execute()
-unique_dates = set(g['date'] for g in all_games.data)
+unique_dates = {row['date'] for row in db.execute('SELECT DISTINCT date FROM games')}
 print(f'\nUnique dates in database: {unique_dates}')
@@ -2,39 +2,39 @@ import sys
 import io
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
-from dotenv import load_dotenv
-import os
-from supabase import create_client
+from mirror import open_mirror
 
-load_dotenv()
-supabase = create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_SERVICE_KEY'))
+db = open_mirror()
 
 # Get first 5 games
-games = supabase.table('games').select('id, match').limit(5).execute()
+games = db.execute('SELECT id, match FROM games LIMIT 5').fetchall()
 
 print('First 5 games - checking for Match Odds - Regular Time:\n')
 
-for g in games.data:
+for g in games:
     game_id = g['id']
     match = g['match']
 
     # Get Match Odds - Regular Time for this game
-    match_odds = supabase.table('odds').select('market, option, odd').eq('game_id', game_id).eq('market', 'Match Odds - Regular Time').execute()
+    match_odds = db.execute(
+        'SELECT market, option, odd FROM odds WHERE game_id = ? AND market = ?',
+        (game_id, 'Match Odds - Regular Time')
+    ).fetchall()
 
     # Get total odds for this game
-    all_odds = supabase.table('odds').select('id', count='exact').eq('game_id', game_id).execute()
+    all_odds = db.execute('SELECT COUNT(*) FROM odds WHERE game_id = ?', (game_id,)).fetchone()[0]
 
     print(f"Match: {match[:50]}")
     print(f"  Game ID: {game_id}")
-    print(f"  Total odds: {all_odds.count}")
-    print(f"  Match Odds - Regular Time: {len(match_odds.data)}")
-    if match_odds.data:
-        for odd in match_odds.data:
+    print(f"  Total odds: {all_odds}")
+    print(f"  Match Odds - Regular Time: {len(match_odds)}")
+    if match_odds:
+        for odd in match_odds:
             print(f"    {odd['option']}: {odd['odd']}")
     else:
         # Show what markets this game has
-        sample_markets = supabase.table('odds').select('market').eq('game_id', game_id).limit(5).execute()
+        sample_markets = db.execute('SELECT market FROM odds WHERE game_id = ? LIMIT 5', (game_id,)).fetchall()
         print(f"  Sample markets available:")
-        for m in sample_markets.data:
+        for m in sample_markets:
             print(f"    - {m['market']}")
     print()
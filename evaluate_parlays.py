@@ -4,12 +4,18 @@ Runs evening pipeline to scrape results and evaluate pending parlays
 """
 
 import json
+import math
 import subprocess
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timedelta
 from pathlib import Path
 import os
 from supabase import create_client, Client
 
+from models import Parlay, Pick
+from settlement import is_called_off, settle_to_evaluated_bets
+from supabase_paging import fetch_all_rows
+
 # Supabase configuration
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
@@ -22,14 +28,81 @@ supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
 # Paths
 FLASH_URLS_DIR = Path("C:/Users/35844/Parlay/Flash_URLs")
 RESULTS_DIR = FLASH_URLS_DIR / "Results_and_Evaluations"
-
-
-def run_phases_3_4(hours_ago: float = 3.0):
+PENDING_FIXTURES_FILE = FLASH_URLS_DIR / "pending_fixtures.json"
+STUCK_FIXTURES_FILE = FLASH_URLS_DIR / "stuck_fixtures.json"
+MAX_LOOKBACK_HOURS = 48  # Games still unsettled this long after kickoff are reported, not re-scraped
+SETTLED_RESULTS = ('WON', 'LOST', 'VOID')  # Phase 4 also emits 'UNKNOWN', which settles nothing
+
+
+def get_pending_fixtures(now: datetime | None = None) -> list:
+    """Started games that still have unsettled picks, with their Flashscore URLs"""
+    print("\n🔍 Finding games with unsettled picks...")
+    now = now or datetime.now()
+
+    # Distinct games of unsettled picks (paged - there are 4 picks per parlay)
+    # Tickets from the old web app stored result 'pending' until supabase_migrations.sql nulls it
+    picks = fetch_all_rows(lambda: supabase.table('parlay_picks')
+                           .select('game_id')
+                           .or_('result.is.null,result.eq.pending')
+                           .order('id'))
+    game_ids = {row['game_id'] for row in picks}
+
+    fixtures = []
+    ids = sorted(game_ids)
+    for i in range(0, len(ids), 100):
+        rows = supabase.table('games') \
+            .select('id, event_id, date, time, match, flashscore_url') \
+            .in_('id', ids[i:i + 100]) \
+            .execute().data
+        for row in rows:
+            kickoff = datetime.fromisoformat(f"{row['date']}T{row['time']}")
+            if kickoff <= now:
+                fixtures.append({
+                    'game_id': row['id'],
+                    'event_id': row['event_id'],
+                    'match': row['match'],
+                    'kickoff': kickoff.isoformat(timespec='minutes'),
+                    'flashscoreUrl': row['flashscore_url'],
+                })
+
+    fixtures.sort(key=lambda f: f['kickoff'])
+    print(f"   {len(fixtures)} started games with unsettled picks ({len(game_ids) - len(fixtures)} not started yet)")
+    return fixtures
+
+
+def split_stuck_fixtures(fixtures: list, now: datetime | None = None) -> tuple[list, list]:
+    """Split off fixtures that kicked off more than MAX_LOOKBACK_HOURS ago (bad URL, no result...)"""
+    now = now or datetime.now()
+    cutoff = now - timedelta(hours=MAX_LOOKBACK_HOURS)
+    stuck = [f for f in fixtures if datetime.fromisoformat(f['kickoff']) < cutoff]
+    recent = [f for f in fixtures if datetime.fromisoformat(f['kickoff']) >= cutoff]
+
+    if stuck:
+        print(f"\n⚠️  {len(stuck)} games still unsettled over {MAX_LOOKBACK_HOURS}h after kickoff - not scraped, check manually:")
+        for fixture in stuck:
+            print(f"   {fixture['kickoff']}  {fixture['match']}  {fixture['flashscoreUrl'] or '(no Flashscore URL)'}")
+    return recent, stuck
+
+
+def lookback_hours(fixtures: list, now: datetime | None = None) -> float:
+    """Scrape window reaching back to the oldest pending kickoff, at most MAX_LOOKBACK_HOURS"""
+    now = now or datetime.now()
+    oldest = datetime.fromisoformat(fixtures[0]['kickoff'])
+    hours = math.ceil((now - oldest).total_seconds() / 3600)
+    return float(min(MAX_LOOKBACK_HOURS, max(1, hours)))
+
+
+def run_phases_3_4(hours_ago: float = 3.0, fixtures_file: Path | None = None):
     """Run Phases 3 & 4: Scrape results and evaluate bets"""
     print(f"🚀 Running Phases 3 & 4 (games from {hours_ago} hours ago)...")
 
+    command = ["node", "run-phases-3-4.js", str(hours_ago)]
+    if fixtures_file:
+        # Only scrape the games people have open picks on
+        command += ["--fixtures", str(fixtures_file)]
+
     result = subprocess.run(
-        ["node", "run-phases-3-4.js", str(hours_ago)],
+        command,
         cwd=str(FLASH_URLS_DIR),
         capture_output=True,
         text=True
@@ -75,60 +148,107 @@ def get_latest_results() -> tuple[list, list]:
     return results, evaluated_bets
 
 
-def get_pending_parlays() -> list:
+def void_called_off_games(fixtures: list, results: list) -> int:
+    """Void every pick on postponed / cancelled / abandoned games in one database call"""
+    called_off = {result['match'] for result in results if result.get('match') and is_called_off(result)}
+    game_ids = [fixture['game_id'] for fixture in fixtures if fixture['match'] in called_off]
+    if not game_ids:
+        return 0
+
+    print(f"\n🚫 Voiding {len(game_ids)} called-off games...")
+    # Set-based in the database: marks the picks and recomputes total odds/status of every affected parlay
+    updated = supabase.rpc('void_games', {'game_uuids': game_ids}).execute().data
+    print(f"   Updated {updated} parlays")
+    return updated
+
+
+def get_pending_parlays() -> list[Parlay]:
     """Fetch all pending parlays from database"""
     print("\n🔍 Fetching pending parlays...")
 
-    response = supabase.table('parlays') \
-        .select('*, parlay_picks(*, odds(*), games(*))') \
-        .eq('status', 'pending') \
-        .execute()
+    # Paged - PostgREST caps a response at 1000 rows
+    rows = fetch_all_rows(lambda: supabase.table('parlays')
+                          .select('id, user_id, status, total_odds, '
+                                  'parlay_picks(id, game_id, event_id, market, option, odd, result, games(match, sport))')
+                          .eq('status', 'pending')
+                          .order('id'))
+    parlays = [Parlay.from_row(row) for row in rows]
 
-    parlays = response.data
     print(f"   Found {len(parlays)} pending parlays")
 
     return parlays
 
 
-def match_pick_to_result(pick: dict, evaluated_bets: list) -> str | None:
-    """Match a parlay pick to an evaluated bet result"""
-    # Try matching by event_id, match name, market, and option
+def index_evaluated_bets(evaluated_bets: list) -> dict:
+    """Map (match, market, option) -> result, keeping the first settled evaluation of each bet"""
+    verdicts = {}
     for bet in evaluated_bets:
-        # Match by game details
-        if (pick['games']['match'] == bet['match'] and
-            pick['market'] == bet['market'] and
-            pick['option'] == bet['option']):
-            return bet['result']  # 'WON', 'LOST', or 'UNKNOWN'
+        if bet['result'] in SETTLED_RESULTS:
+            verdicts.setdefault((bet['match'], bet['market'], bet['option']), bet['result'])
+    return verdicts
 
-    return None
 
+def add_settled_picks(parlays: list[Parlay], results: list, verdicts: dict) -> dict:
+    """Settle picks missing from the Phase 4 evaluations directly from final scores"""
+    missing = {}
+    for parlay in parlays:
+        for pick in parlay.picks:
+            if pick.key not in verdicts:
+                missing[pick.key] = {'match': pick.match, 'market': pick.market, 'option': pick.option, 'sport': pick.sport}
 
-def evaluate_parlay(parlay: dict, evaluated_bets: list) -> dict:
+    settled = 0
+    for bet in settle_to_evaluated_bets(list(missing.values()), results):
+        verdicts[(bet['match'], bet['market'], bet['option'])] = bet['result']
+        settled += 1
+    print(f"   Settled {settled}/{len(missing)} uncovered picks from final scores")
+
+    return verdicts
+
+
+def match_pick_to_result(pick: Pick, verdicts: dict) -> str | None:
+    """Match a parlay pick to an evaluated bet result"""
+    if pick.result == 'void':
+        return 'VOID'  # Voided with its game
+    # Match by game details: match name, market, and option
+    result = verdicts.get(pick.key)
+    return result if result in SETTLED_RESULTS else None
+
+
+def evaluate_parlay(parlay: Parlay, verdicts: dict) -> dict:
     """Evaluate a single parlay based on results"""
-    picks = parlay['parlay_picks']
     pick_results = []
 
-    for pick in picks:
-        result = match_pick_to_result(pick, evaluated_bets)
+    for pick in parlay.picks:
+        result = match_pick_to_result(pick, verdicts)
 
         if result is None:
-            # No result found - game probably hasn't finished yet
+            # No settled result - game probably hasn't finished yet (or Phase 4 couldn't tell)
             return {
                 'status': 'pending',
                 'pick_results': []
             }
 
         pick_results.append({
-            'pick_id': pick['id'],
-            'result': result.lower()  # 'won' or 'lost'
+            'pick_id': pick.id,
+            'result': result.lower()  # 'won', 'lost' or 'void'
         })
 
-    # Determine parlay status
-    all_won = all(pr['result'] == 'won' for pr in pick_results)
-    parlay_status = 'won' if all_won else 'lost'
+    # Determine parlay status - void picks count as neither won nor lost
+    results = [pr['result'] for pr in pick_results]
+    if 'lost' in results:
+        parlay_status = 'lost'
+    elif all(result == 'void' for result in results):
+        parlay_status = 'void'
+    else:
+        parlay_status = 'won'
+
+    # Void picks drop out of the total odds (a void leg pays 1.00)
+    live_odds = [pick.odd for pick, result in zip(parlay.picks, results) if result != 'void']
+    total_odds = round(math.prod(live_odds, start=1.0), 2)
 
     return {
         'status': parlay_status,
+        'total_odds': total_odds,
         'pick_results': pick_results
     }
 
@@ -138,6 +258,7 @@ def update_parlay_results(parlay_id: str, evaluation: dict):
     # Update parlay status
     supabase.table('parlays').update({
         'status': evaluation['status'],
+        'total_odds': evaluation['total_odds'],
         'evaluated_at': datetime.now().isoformat()
     }).eq('id', parlay_id).execute()
 
@@ -148,62 +269,91 @@ def update_parlay_results(parlay_id: str, evaluation: dict):
         }).eq('id', pick_result['pick_id']).execute()
 
 
-def main():
-    """Main evaluation pipeline"""
+def run_pipeline(now: datetime | None = None, scrape_results=run_phases_3_4) -> dict:
+    """Phases 3 & 4 and parlay settlement; returns parlay id -> status for every pending parlay
+
+    The scraper is a parameter so the replay harness can stand archived
+    artifacts in for it - every other step runs as in production.
+    """
     print("=" * 60)
     print("4PLAY - Evening Evaluation Pipeline (Phases 3 & 4)")
     print("=" * 60)
+    now = now or datetime.now()
 
     try:
-        # Step 1: Run Phases 3 & 4 to get results
-        run_phases_3_4(hours_ago=3.0)  # Adjust based on game times
+        # Step 1: Find the games that still have unsettled picks (stuck ones are only reported)
+        fixtures, stuck = split_stuck_fixtures(get_pending_fixtures(now), now)
+
+        with open(STUCK_FIXTURES_FILE, 'w', encoding='utf-8') as f:
+            json.dump(stuck, f, ensure_ascii=False, indent=2)
+
+        if not fixtures:
+            print("\n✅ No recently started games with unsettled picks - skipping result scraping")
+            return {}
+
+        with open(PENDING_FIXTURES_FILE, 'w', encoding='utf-8') as f:
+            json.dump(fixtures, f, ensure_ascii=False, indent=2)
+
+        # Step 2: Run Phases 3 & 4 for exactly those games
+        scrape_results(hours_ago=lookback_hours(fixtures, now), fixtures_file=PENDING_FIXTURES_FILE)
 
-        # Step 2: Load results
+        # Step 3: Load results
         results, evaluated_bets = get_latest_results()
 
-        # Step 3: Get pending parlays
+        # Step 4: Void picks on called-off games (settles parlays left with only void/won picks)
+        void_called_off_games(fixtures, results)
+
+        # Step 5: Get pending parlays
         parlays = get_pending_parlays()
 
         if not parlays:
             print("\n✅ No pending parlays to evaluate")
-            return
+            return {}
 
-        # Step 4: Evaluate each parlay
-        print("\n🎲 Evaluating parlays...\n")
+        # Step 6: Settle picks Phase 4 didn't evaluate from final scores
+        verdicts = add_settled_picks(parlays, results, index_evaluated_bets(evaluated_bets))
 
-        won_count = 0
-        lost_count = 0
-        still_pending = 0
+        # Step 7: Evaluate each parlay
+        print("\n🎲 Evaluating parlays...\n")
 
+        statuses = {}
         for parlay in parlays:
-            evaluation = evaluate_parlay(parlay, evaluated_bets)
+            evaluation = evaluate_parlay(parlay, verdicts)
+            statuses[parlay.id] = evaluation['status']
 
             if evaluation['status'] == 'pending':
-                still_pending += 1
-                print(f"   ⏳ Parlay {parlay['id'][:8]} - Still pending (games not finished)")
+                print(f"   ⏳ Parlay {parlay.id[:8]} - Still pending (games not finished)")
                 continue
 
             # Update database
-            update_parlay_results(parlay['id'], evaluation)
+            update_parlay_results(parlay.id, evaluation)
 
             if evaluation['status'] == 'won':
-                won_count += 1
-                print(f"   ✅ Parlay {parlay['id'][:8]} - WON (odds: {parlay['total_odds']})")
+                print(f"   ✅ Parlay {parlay.id[:8]} - WON (odds: {evaluation['total_odds']})")
+            elif evaluation['status'] == 'void':
+                print(f"   ↩️  Parlay {parlay.id[:8]} - VOID (stake returned)")
             else:
-                lost_count += 1
-                print(f"   ❌ Parlay {parlay['id'][:8]} - LOST")
+                print(f"   ❌ Parlay {parlay.id[:8]} - LOST")
 
+        counts = Counter(statuses.values())
         print(f"\n📊 Evaluation Summary:")
-        print(f"   Won: {won_count}")
-        print(f"   Lost: {lost_count}")
-        print(f"   Still Pending: {still_pending}")
+        print(f"   Won: {counts['won']}")
+        print(f"   Lost: {counts['lost']}")
+        print(f"   Void: {counts['void']}")
+        print(f"   Still Pending: {counts['pending']}")
 
         print("\n🎉 Evaluation complete!")
+        return statuses
 
     except Exception as e:
         print(f"\n❌ Evaluation failed: {e}")
         raise
 
 
+def main():
+    """Main evaluation pipeline"""
+    run_pipeline()
+
+
 if __name__ == "__main__":
     main()
@@ -2,12 +2,9 @@ import sys
 import io
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
-from dotenv import load_dotenv
-import os
-from supabase import create_client
+from mirror import open_mirror
 
-load_dotenv()
-supabase = create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_SERVICE_KEY'))
+db = open_mirror()
 
 print("🔍 Checking market names for Football vs Ice Hockey:\n")
 
@@ -15,9 +12,9 @@ print("🔍 Checking market names for Football vs Ice Hockey:\n")
 print("=" * 60)
 print("FOOTBALL GAMES:")
 print("=" * 60)
-football_games = supabase.table('games').select('id, match').eq('sport', 'Football').limit(2).execute()
+football_games = db.execute("SELECT id, match FROM games WHERE sport = 'Football' LIMIT 2").fetchall()
 
-for game in football_games.data:
+for game in football_games:
     game_id = game['id']
     match = game['match']
 
@@ -25,18 +22,18 @@ for game in football_games.data:
     print(f"   Game ID: {game_id}")
 
     # Get all odds for this game
-    odds = supabase.table('odds').select('market, option, odd').eq('game_id', game_id).execute()
+    odds = db.execute('SELECT market, option, odd FROM odds WHERE game_id = ?', (game_id,)).fetchall()
 
     # Get unique markets
     markets = {}
-    for odd in odds.data:
+    for odd in odds:
         market = odd['market']
         if market not in markets:
             markets[market] = []
         markets[market].append({'option': odd['option'], 'odd': odd['odd']})
 
     print(f"   Total markets: {len(markets)}")
-    print(f"   Total odds: {len(odds.data)}")
+    print(f"   Total odds: {len(odds)}")
 
     # Check for Match Odds - Regular Time
     if 'Match Odds - Regular Time' in markets:
@@ -57,9 +54,9 @@ for game in football_games.data:
 print("\n\n" + "=" * 60)
 print("ICE HOCKEY GAMES:")
 print("=" * 60)
-hockey_games = supabase.table('games').select('id, match').eq('sport', 'Ice Hockey').limit(2).execute()
+hockey_games = db.execute("SELECT id, match FROM games WHERE sport = 'Ice Hockey' LIMIT 2").fetchall()
 
-for game in hockey_games.data:
+for game in hockey_games:
     game_id = game['id']
     match = game['match']
 
@@ -67,18 +64,18 @@ for game in hockey_games.data:
     print(f"   Game ID: {game_id}")
 
     # Get all odds for this game
-    odds = supabase.table('odds').select('market, option, odd').eq('game_id', game_id).execute()
+    odds = db.execute('SELECT market, option, odd FROM odds WHERE game_id = ?', (game_id,)).fetchall()
 
     # Get unique markets
     markets = {}
-    for odd in odds.data:
+    for odd in odds:
         market = odd['market']
         if market not in markets:
             markets[market] = []
         markets[market].append({'option': odd['option'], 'odd': odd['odd']})
 
     print(f"   Total markets: {len(markets)}")
-    print(f"   Total odds: {len(odds.data)}")
+    print(f"   Total odds: {len(odds)}")
 
     # Check for Match Odds - Regular Time
     if 'Match Odds - Regular Time' in markets:
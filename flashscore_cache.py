@@ -0,0 +1,133 @@
+"""
+4PLAY - Flashscore Mapping Cache
+Persistent cache of Phase 2 results (fixture -> Flashscore URL)
+so the morning pipeline only sends fixtures it has never matched to the URL matcher.
+Fixtures the matcher couldn't find are remembered for MISS_TTL, so one unmatchable
+fixture doesn't rerun Phase 2 every morning.
+"""
+
+import json
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+CACHE_VERSION = 1
+KEEP_DAYS = 7  # Drop fixtures that kicked off more than a week ago
+MISS_TTL = timedelta(hours=12)  # Retry fixtures Phase 2 couldn't match after this long
+
+
+def empty_cache() -> dict:
+    """New cache in the current format"""
+    return {'version': CACHE_VERSION, 'fixtures': {}, 'misses': {}}
+
+
+def fixture_key(date_str: str, match: str) -> str:
+    """Cache key for one fixture (same teams can meet again on another date)"""
+    return f"{date_str}|{match}"
+
+
+def load_cache(path: Path) -> dict:
+    """Load the cache, starting fresh if it is missing, unreadable or from an older version"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return empty_cache()
+
+    if cache.get('version') != CACHE_VERSION:
+        print(f"   ⚠️  Flashscore cache version {cache.get('version')} != {CACHE_VERSION}, rebuilding")
+        return empty_cache()
+
+    cache.setdefault('misses', {})  # Caches written before misses were recorded
+    for unused in ('teams', 'leagues'):  # Maps older caches kept but nothing read
+        cache.pop(unused, None)
+    return cache
+
+
+def save_cache(cache: dict, path: Path, today: date | None = None):
+    """Prune old fixtures and write the cache atomically"""
+    cutoff = ((today or datetime.now().date()) - timedelta(days=KEEP_DAYS)).strftime("%Y-%m-%d")
+    cache['fixtures'] = {k: v for k, v in cache['fixtures'].items() if v['date'] >= cutoff}
+    cache['misses'] = {k: v for k, v in cache['misses'].items() if v['date'] >= cutoff}
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def update_cache(cache: dict, matched_games: list, games: list) -> int:
+    """Add Phase 2 matches to the cache, dating each fixture from the Phase 1 games"""
+    # matched_games has no kickoff date, so take it from the games it was built from
+    fixtures = {}
+    for game in games:
+        fixtures.setdefault(game.match, game)
+
+    added = 0
+    for matched in matched_games:
+        url = matched.get('flashscoreUrl')
+        game = fixtures.get(matched['match'])
+        if not url or not game:
+            continue
+
+        key = fixture_key(game.date, game.match)
+        if key not in cache['fixtures']:
+            added += 1
+        cache['fixtures'][key] = {
+            'date': game.date,
+            'match': game.match,
+            'sport': game.sport,
+            'league': game.league,
+            'flashscoreUrl': url,
+        }
+
+    return added
+
+
+def record_misses(cache: dict, sent: list, matched_games: list, now: datetime | None = None) -> int:
+    """Remember fixtures sent to Phase 2 that came back without a URL"""
+    now = now or datetime.now()
+    matched = {m['match'] for m in matched_games if m.get('flashscoreUrl')}
+    missed = 0
+    for event in sent:
+        key = fixture_key(event.date, event.match)
+        if event.match in matched:
+            cache['misses'].pop(key, None)
+        else:
+            cache['misses'][key] = {'date': event.date, 'match': event.match, 'checked_at': now.isoformat()}
+            missed += 1
+    return missed
+
+
+def find_uncached(cache: dict, events, now: datetime | None = None) -> list:
+    """Events with no cached Flashscore URL, except recent misses"""
+    now = now or datetime.now()
+    uncached = []
+    for e in events:
+        key = fixture_key(e.date, e.match)
+        miss = cache['misses'].get(key)
+        if key in cache['fixtures'] or (miss and now - datetime.fromisoformat(miss['checked_at']) < MISS_TTL):
+            continue
+        uncached.append(e)
+    return uncached
+
+
+def write_fixtures(events, path: Path):
+    """Fixtures for the URL matcher to resolve (its --fixtures input)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([
+            {'date': e.date, 'time': e.time, 'sport': e.sport, 'league': e.league, 'match': e.match}
+            for e in events
+        ], f, ensure_ascii=False, indent=2)
+
+
+def cached_matched_games(cache: dict, events) -> list:
+    """Cached matches for the given events, in the matched_games_*.json shape"""
+    matched_games = []
+    for event in events:
+        fixture = cache['fixtures'].get(fixture_key(event.date, event.match))
+        if fixture:
+            matched_games.append({'match': fixture['match'], 'flashscoreUrl': fixture['flashscoreUrl']})
+    return matched_games
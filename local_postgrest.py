@@ -0,0 +1,635 @@
+"""
+4PLAY - Local PostgREST Stand-in
+Serves the subset of the Supabase REST API used by the data pipeline scripts,
+backed by SQLite, so the pipelines can run offline (replay harness, testing).
+
+Run standalone: python local_postgrest.py --port 54321
+Then point the scripts at it: SUPABASE_URL=http://127.0.0.1:54321
+"""
+
+import argparse
+import base64
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+# Mirrors supabase_schema.sql (minus auth, RLS and views)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+  id TEXT PRIMARY KEY,
+  event_id TEXT UNIQUE NOT NULL,
+  date TEXT NOT NULL,
+  time TEXT NOT NULL,
+  sport TEXT NOT NULL CHECK (sport IN ('Ice Hockey', 'Football')),
+  league TEXT NOT NULL,
+  match TEXT NOT NULL,
+  flashscore_url TEXT,
+  is_available BOOLEAN DEFAULT 1,
+  created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+  updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS odds (
+  id TEXT PRIMARY KEY,
+  game_id TEXT NOT NULL REFERENCES games(id) ON DELETE CASCADE,
+  event_id TEXT NOT NULL,
+  market TEXT NOT NULL,
+  option TEXT NOT NULL,
+  odd REAL NOT NULL,
+  is_available BOOLEAN NOT NULL DEFAULT 1,
+  created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+CREATE INDEX IF NOT EXISTS idx_odds_game_id ON odds(game_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_odds_game_market_option ON odds(game_id, market, option);
+
+CREATE TABLE IF NOT EXISTS parlays (
+  id TEXT PRIMARY KEY,
+  user_id TEXT NOT NULL,
+  created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+  status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'won', 'lost', 'void')),
+  evaluated_at TEXT,
+  total_odds REAL NOT NULL,
+  updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+CREATE INDEX IF NOT EXISTS idx_parlays_status ON parlays(status);
+
+CREATE TABLE IF NOT EXISTS parlay_picks (
+  id TEXT PRIMARY KEY,
+  parlay_id TEXT NOT NULL REFERENCES parlays(id) ON DELETE CASCADE,
+  game_id TEXT NOT NULL REFERENCES games(id) ON DELETE CASCADE,
+  event_id TEXT NOT NULL,
+  odds_id TEXT NOT NULL REFERENCES odds(id) ON DELETE CASCADE,
+  market TEXT NOT NULL,
+  option TEXT NOT NULL,
+  odd REAL NOT NULL,
+  result TEXT CHECK (result IS NULL OR result IN ('won', 'lost', 'void')),
+  created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+  updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+CREATE INDEX IF NOT EXISTS idx_parlay_picks_parlay_id ON parlay_picks(parlay_id);
+CREATE INDEX IF NOT EXISTS idx_parlay_picks_game_id ON parlay_picks(game_id);
+
+CREATE TABLE IF NOT EXISTS user_profiles (
+  id TEXT PRIMARY KEY,
+  username TEXT UNIQUE NOT NULL,
+  created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS odds_changes (
+  seq INTEGER PRIMARY KEY AUTOINCREMENT,
+  game_id TEXT NOT NULL REFERENCES games(id) ON DELETE CASCADE,
+  odds_id TEXT REFERENCES odds(id) ON DELETE CASCADE,
+  change TEXT NOT NULL CHECK (change IN ('game_added', 'locked', 'unlocked', 'added', 'price', 'suspended', 'resumed')),
+  market TEXT,
+  option TEXT,
+  odd REAL,
+  created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+-- Same feed rules as the log_odds_change / log_game_change triggers in supabase_schema.sql
+CREATE TRIGGER IF NOT EXISTS on_odds_added AFTER INSERT ON odds
+BEGIN
+  INSERT INTO odds_changes (game_id, odds_id, change, market, option, odd)
+  VALUES (NEW.game_id, NEW.id, 'added', NEW.market, NEW.option, NEW.odd);
+END;
+
+CREATE TRIGGER IF NOT EXISTS on_odds_changed AFTER UPDATE OF odd, is_available ON odds
+WHEN NEW.is_available IS NOT OLD.is_available OR NEW.odd IS NOT OLD.odd
+BEGIN
+  INSERT INTO odds_changes (game_id, odds_id, change, market, option, odd)
+  VALUES (
+    NEW.game_id, NEW.id,
+    CASE
+      WHEN NEW.is_available IS OLD.is_available THEN 'price'
+      WHEN NEW.is_available THEN 'resumed'
+      ELSE 'suspended'
+    END,
+    NEW.market, NEW.option, NEW.odd
+  );
+END;
+
+CREATE TRIGGER IF NOT EXISTS on_game_added AFTER INSERT ON games
+BEGIN
+  INSERT INTO odds_changes (game_id, change) VALUES (NEW.id, 'game_added');
+END;
+
+CREATE TRIGGER IF NOT EXISTS on_game_changed AFTER UPDATE OF is_available ON games
+WHEN NEW.is_available IS NOT OLD.is_available
+BEGIN
+  INSERT INTO odds_changes (game_id, change)
+  VALUES (NEW.id, CASE WHEN NEW.is_available THEN 'unlocked' ELSE 'locked' END);
+END;
+
+-- Same as the touch_updated_at triggers (SQLite can't assign NEW, so update the row again)
+CREATE TRIGGER IF NOT EXISTS on_game_updated AFTER UPDATE ON games
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+  UPDATE games SET updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now') WHERE id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS on_parlay_updated AFTER UPDATE ON parlays
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+  UPDATE parlays SET updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now') WHERE id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS on_parlay_pick_updated AFTER UPDATE ON parlay_picks
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+  UPDATE parlay_picks SET updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now') WHERE id = NEW.id;
+END;
+"""
+
+# Same statements as the void_games function in supabase_schema.sql; ? is a JSON array of game ids
+VOID_GAMES_SQL = [
+    """UPDATE games SET is_available = 0
+    WHERE id IN (SELECT value FROM json_each(?)) AND is_available""",
+    """UPDATE parlay_picks SET result = 'void'
+    WHERE game_id IN (SELECT value FROM json_each(?)) AND (result IS NULL OR result = 'pending')""",
+    """UPDATE parlays AS p
+    SET
+      total_odds = t.total_odds,
+      status = t.status,
+      evaluated_at = CASE WHEN t.status <> 'pending' THEN strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now') END
+    FROM (
+      SELECT
+        pp.parlay_id,
+        ROUND(COALESCE(EXP(SUM(LN(pp.odd)) FILTER (WHERE pp.result IS NOT 'void')), 1), 2) AS total_odds,
+        CASE
+          WHEN COUNT(*) FILTER (WHERE pp.result = 'lost') > 0 THEN 'lost'
+          WHEN COUNT(*) FILTER (WHERE pp.result = 'void') = COUNT(*) THEN 'void'
+          WHEN COUNT(*) FILTER (WHERE pp.result IN ('won', 'void')) = COUNT(*) THEN 'won'
+          ELSE 'pending'
+        END AS status
+      FROM parlay_picks pp
+      WHERE pp.parlay_id IN (
+        SELECT parlay_id FROM parlay_picks
+        WHERE game_id IN (SELECT value FROM json_each(?)) AND result = 'void'
+      )
+      GROUP BY pp.parlay_id
+    ) AS t
+    WHERE p.id = t.parlay_id AND p.status = 'pending'""",
+]
+
+# Same checks and inserts as the submit_parlay function in supabase_schema.sql; ? is a JSON array of odds ids
+SUBMIT_PARLAY_CHECK_SQL = """
+SELECT
+  COUNT(DISTINCT o.id) AS pick_count,
+  COUNT(DISTINCT o.game_id) AS game_count,
+  COUNT(*) FILTER (WHERE g.is_available AND o.is_available) AS open_count,
+  ROUND(EXP(SUM(LN(o.odd))), 2) AS total
+FROM odds o
+JOIN games g ON g.id = o.game_id
+WHERE o.id IN (SELECT value FROM json_each(?))"""
+SUBMIT_PARLAY_ODDS_SQL = """
+SELECT o.game_id, o.event_id, o.id, o.market, o.option, o.odd
+FROM odds o
+WHERE o.id IN (SELECT value FROM json_each(?))"""
+
+# (table, column) -> referenced table, used to resolve embedded selects
+FOREIGN_KEYS = {
+    ('odds', 'game_id'): 'games',
+    ('odds_changes', 'game_id'): 'games',
+    ('odds_changes', 'odds_id'): 'odds',
+    ('parlay_picks', 'parlay_id'): 'parlays',
+    ('parlay_picks', 'game_id'): 'games',
+    ('parlay_picks', 'odds_id'): 'odds',
+}
+
+# Database functions callable at /rpc/<name>, as LocalDatabase methods -> whether they take auth.uid() as user_id
+RPC_FUNCTIONS = {'void_games': False, 'submit_parlay': True}
+FILTER_OPERATORS = {'eq': '=', 'neq': '!=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+RESERVED_PARAMS = {'select', 'order', 'offset', 'limit', 'columns', 'on_conflict'}
+SQLITE_MAX_PARAMS = 900
+
+
+class PostgrestError(Exception):
+    """Error returned to the client as a PostgREST-style JSON body"""
+
+    def __init__(self, status: int, message: str, code: str = "PGRST000"):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+def user_token(user_id: str) -> str:
+    """Unsigned JWT the stand-in accepts as a session for `user_id`"""
+    def encode(part: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(part).encode('utf-8')).rstrip(b"=").decode('ascii')
+    return f"{encode({'alg': 'none', 'typ': 'JWT'})}.{encode({'sub': user_id, 'role': 'authenticated'})}."
+
+
+def token_subject(authorization: str | None) -> str | None:
+    """auth.uid() for a request: the `sub` claim of its Bearer JWT (signature not checked)"""
+    token = (authorization or "").removeprefix("Bearer ").strip()
+    if token.count(".") != 2:
+        return None
+    payload = token.split(".")[1]
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except ValueError:
+        return None
+    return claims.get('sub') if isinstance(claims, dict) else None
+
+
+def parse_select(select: str) -> list:
+    """Parse a select string like '*, parlay_picks(*, games(*))' into a tree"""
+    items = []
+    depth = 0
+    token = ""
+    for char in select + ",":
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            token = token.strip()
+            if token:
+                if "(" in token:
+                    name, inner = token.split("(", 1)
+                    items.append((name.strip(), parse_select(inner[:-1])))
+                else:
+                    items.append(token.strip('"'))
+            token = ""
+        else:
+            token += char
+    return items
+
+
+def parse_filter_value(raw: str) -> tuple[str, object]:
+    """Split a PostgREST filter like 'eq.2025-11-20' into (operator, value)"""
+    operator, _, value = raw.partition(".")
+    if operator == "in":
+        values = [v.strip().strip('"') for v in value.strip("()").split(",") if v.strip()]
+        return operator, values
+    if operator == "is":
+        return operator, {"null": None, "true": 1, "false": 0}[value]
+    return operator, value
+
+
+class LocalDatabase:
+    """SQLite-backed tables with PostgREST query semantics"""
+
+    def __init__(self, db_path: str = ":memory:"):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.columns = {}
+        self.bool_columns = {}
+        for (table,) in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'"):
+            info = self.conn.execute(f"PRAGMA table_info({table})").fetchall()
+            self.columns[table] = [col['name'] for col in info]
+            self.bool_columns[table] = {col['name'] for col in info if col['type'] == 'BOOLEAN'}
+
+    def _check_table(self, table: str):
+        if table not in self.columns:
+            raise PostgrestError(404, f'relation "public.{table}" does not exist', "42P01")
+
+    def _to_db(self, table: str, column: str, value):
+        if column in self.bool_columns[table] and isinstance(value, str):
+            return 1 if value == "true" else 0
+        return value
+
+    def _from_db(self, table: str, row: sqlite3.Row) -> dict:
+        data = dict(row)
+        for column in self.bool_columns[table]:
+            if data.get(column) is not None:
+                data[column] = bool(data[column])
+        return data
+
+    def _where(self, table: str, filters: list) -> tuple[str, list]:
+        clauses = []
+        params = []
+        for column, raw in filters:
+            if column == "or":
+                # or=(a.is.null,b.eq.x) - each condition is a column filter, joined with OR
+                conditions = [condition.partition(".") for condition in raw.strip("()").split(",")]
+                parts = [self._where(table, [(c, r)]) for c, _, r in conditions]
+                clauses.append("(" + " OR ".join(where.removeprefix(" WHERE ") for where, _ in parts) + ")")
+                params.extend(param for _, part_params in parts for param in part_params)
+                continue
+            if column not in self.columns[table]:
+                raise PostgrestError(400, f"column {table}.{column} does not exist", "42703")
+            operator, value = parse_filter_value(raw)
+            if operator == "in":
+                if not value:
+                    clauses.append("0")
+                    continue
+                clauses.append(f'"{column}" IN ({",".join("?" * len(value))})')
+                params.extend(self._to_db(table, column, v) for v in value)
+            elif operator == "is":
+                clauses.append(f'"{column}" IS ?')
+                params.append(value)
+            elif operator in FILTER_OPERATORS:
+                clauses.append(f'"{column}" {FILTER_OPERATORS[operator]} ?')
+                params.append(self._to_db(table, column, value))
+            else:
+                raise PostgrestError(400, f"unsupported operator: {operator}")
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _rows_where_in(self, table: str, column: str, values: list) -> list:
+        rows = []
+        values = list(values)
+        for i in range(0, len(values), SQLITE_MAX_PARAMS):
+            chunk = values[i:i + SQLITE_MAX_PARAMS]
+            rows.extend(self.conn.execute(
+                f'SELECT * FROM {table} WHERE "{column}" IN ({",".join("?" * len(chunk))})', chunk
+            ))
+        return [self._from_db(table, row) for row in rows]
+
+    def _embed(self, table: str, rows: list, select_tree: list) -> list:
+        """Attach embedded resources and project selected columns"""
+        for item in select_tree:
+            if not isinstance(item, tuple):
+                continue
+            relation, sub_tree = item
+            self._check_table(relation)
+
+            # Many-to-one: this table holds the foreign key
+            fk_column = next((c for (t, c), ref in FOREIGN_KEYS.items() if t == table and ref == relation), None)
+            if fk_column:
+                related = self._rows_where_in(relation, 'id', {r[fk_column] for r in rows})
+                related = {r['id']: r for r in self._embed(relation, related, sub_tree + ['id'])}
+                for row in rows:
+                    row[relation] = related.get(row[fk_column])
+                continue
+
+            # One-to-many: the related table holds the foreign key
+            fk_column = next((c for (t, c), ref in FOREIGN_KEYS.items() if t == relation and ref == table), None)
+            if not fk_column:
+                raise PostgrestError(400, f"Could not find a relationship between '{table}' and '{relation}'", "PGRST200")
+            related = self._rows_where_in(relation, fk_column, {r['id'] for r in rows})
+            grouped = {}
+            for child in self._embed(relation, related, sub_tree + [fk_column]):
+                grouped.setdefault(child[fk_column], []).append(child)
+            for row in rows:
+                row[relation] = grouped.get(row['id'], [])
+
+        if "*" in select_tree:
+            return rows
+        keep = [i if not isinstance(i, tuple) else i[0] for i in select_tree]
+        return [{k: row[k] for k in keep if k in row} for row in rows]
+
+    def select(self, table: str, select: str, filters: list, order: str | None,
+               offset: int, limit: int | None) -> tuple[list, int]:
+        self._check_table(table)
+        where, params = self._where(table, filters)
+        with self.lock:
+            total = self.conn.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+            sql = f"SELECT * FROM {table}{where}"
+            if order:
+                terms = []
+                for term in order.split(","):
+                    column, _, direction = term.partition(".")
+                    terms.append(f'"{column}" {"DESC" if direction.startswith("desc") else "ASC"}')
+                sql += " ORDER BY " + ", ".join(terms)
+            else:
+                sql += " ORDER BY rowid"
+            sql += f" LIMIT {limit if limit is not None else -1} OFFSET {offset}"
+            rows = [self._from_db(table, row) for row in self.conn.execute(sql, params)]
+            rows = self._embed(table, rows, parse_select(select))
+        return rows, total
+
+    def insert(self, table: str, records: list, on_conflict: str | None = None) -> list:
+        self._check_table(table)
+        inserted = []
+        with self.lock:
+            try:
+                for record in records:
+                    record = dict(record)
+                    record.setdefault('id', str(uuid.uuid4()))
+                    columns = [c for c in record if c in self.columns[table]]
+                    values = [self._to_db(table, c, record[c]) for c in columns]
+                    quoted = ",".join(f'"{c}"' for c in columns)
+                    sql = f"INSERT INTO {table} ({quoted}) VALUES ({','.join('?' * len(columns))})"
+                    if on_conflict:
+                        updates = ",".join(f'"{c}" = excluded."{c}"' for c in columns if c != on_conflict)
+                        sql += f' ON CONFLICT("{on_conflict}") DO UPDATE SET {updates}'
+                    sql += " RETURNING *"
+                    inserted.append(self._from_db(table, self.conn.execute(sql, values).fetchone()))
+                self.conn.commit()
+            except sqlite3.IntegrityError as e:
+                self.conn.rollback()
+                raise PostgrestError(409, str(e), "23505")
+        return inserted
+
+    def update(self, table: str, changes: dict, filters: list) -> list:
+        self._check_table(table)
+        where, params = self._where(table, filters)
+        columns = [c for c in changes if c in self.columns[table]]
+        assignments = ",".join(f'"{c}" = ?' for c in columns)
+        values = [self._to_db(table, c, changes[c]) for c in columns]
+        with self.lock:
+            rows = self.conn.execute(f"UPDATE {table} SET {assignments}{where} RETURNING *", values + params).fetchall()
+            self.conn.commit()
+        return [self._from_db(table, row) for row in rows]
+
+    def void_games(self, game_uuids: list) -> int:
+        """RPC void_games: void the games' unsettled picks and recompute affected parlays"""
+        ids = json.dumps(game_uuids)
+        with self.lock:
+            cursors = [self.conn.execute(sql, (ids,)) for sql in VOID_GAMES_SQL]
+            self.conn.commit()
+        return cursors[-1].rowcount
+
+    def submit_parlay(self, pick_odds_ids: list, user_id: str | None = None) -> dict:
+        """RPC submit_parlay: validate 4 picks and insert the parlay + picks atomically"""
+        def reject(message: str):
+            raise PostgrestError(400, message, "P0001")
+
+        if user_id is None:
+            reject("You must be logged in to submit a ticket")
+        if len(pick_odds_ids) != 4:
+            reject("A ticket needs exactly 4 picks")
+
+        ids = json.dumps(pick_odds_ids)
+        with self.lock:
+            check = self.conn.execute(SUBMIT_PARLAY_CHECK_SQL, (ids,)).fetchone()
+            if check['pick_count'] != 4:
+                reject("One or more picks are no longer offered")
+            if check['game_count'] != 4:
+                reject("All 4 picks must be from different games")
+            if check['open_count'] != 4:
+                reject("One or more games have already started")
+            try:
+                parlay = self.conn.execute(
+                    "INSERT INTO parlays (id, user_id, status, total_odds) VALUES (?, ?, 'pending', ?) RETURNING *",
+                    (str(uuid.uuid4()), user_id, check['total']),
+                ).fetchone()
+                self.conn.executemany(
+                    "INSERT INTO parlay_picks (id, parlay_id, game_id, event_id, odds_id, market, option, odd) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(str(uuid.uuid4()), parlay['id'], *odd) for odd in self.conn.execute(SUBMIT_PARLAY_ODDS_SQL, (ids,))],
+                )
+                self.conn.commit()
+            except sqlite3.Error:
+                self.conn.rollback()
+                raise
+        return self._from_db('parlays', parlay)
+
+    def delete(self, table: str, filters: list) -> list:
+        self._check_table(table)
+        where, params = self._where(table, filters)
+        with self.lock:
+            rows = self.conn.execute(f"DELETE FROM {table}{where} RETURNING *", params).fetchall()
+            self.conn.commit()
+        return [self._from_db(table, row) for row in rows]
+
+
+class PostgrestHandler(BaseHTTPRequestHandler):
+    """Translates PostgREST HTTP requests into LocalDatabase calls"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Keep-alive responses are written in two parts
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body=None, headers: dict | None = None):
+        payload = b"" if body is None else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self):
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        table = unquote(url.path.rsplit("/", 1)[-1])
+        params = parse_qsl(url.query, keep_blank_values=True)
+        filters = [(k, v) for k, v in params if k not in RESERVED_PARAMS]
+        options = {k: v for k, v in params if k in RESERVED_PARAMS}
+        prefer = self.headers.get("Prefer", "")
+        status = 200
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+
+        try:
+            db = self.server.database
+            if url.path.rsplit("/", 2)[-2] == "rpc":
+                if self.command != "POST" or table not in RPC_FUNCTIONS:
+                    raise PostgrestError(404, f"Could not find the function public.{table}", "PGRST202")
+                args = dict(body or {})
+                if RPC_FUNCTIONS[table]:
+                    args['user_id'] = token_subject(self.headers.get("Authorization"))
+                self._send(200, getattr(db, table)(**args))
+                return status
+
+            if self.command == "GET":
+                limit = int(options['limit']) if 'limit' in options else None
+                if self.server.max_rows is not None:
+                    limit = min(limit if limit is not None else self.server.max_rows, self.server.max_rows)
+                offset = int(options.get('offset', 0))
+                rows, total = db.select(table, options.get('select', '*'), filters, options.get('order'), offset, limit)
+                headers = {}
+                end = offset + len(rows) - 1
+                content_range = f"{offset}-{end}" if rows else "*"
+                headers["Content-Range"] = f"{content_range}/{total if 'count=' in prefer else '*'}"
+                if "vnd.pgrst.object" in self.headers.get("Accept", ""):
+                    if len(rows) != 1:
+                        raise PostgrestError(406, "JSON object requested, multiple (or no) rows returned", "PGRST116")
+                    self._send(200, rows[0], headers)
+                else:
+                    self._send(200, rows, headers)
+                return status
+
+            if self.command == "POST":
+                records = body if isinstance(body, list) else [body]
+                on_conflict = options.get('on_conflict') if "merge-duplicates" in prefer else None
+                rows = db.insert(table, records, on_conflict)
+                status = 201
+            elif self.command == "PATCH":
+                rows = db.update(table, body or {}, filters)
+            elif self.command == "DELETE":
+                rows = db.delete(table, filters)
+            else:
+                raise PostgrestError(405, f"Unsupported method {self.command}")
+
+            if "return=representation" in prefer:
+                if 'select' in options:
+                    rows = db._embed(table, rows, parse_select(options['select']))
+                self._send(status, rows)
+            else:
+                status = 204 if status == 200 else status
+                self._send(status)
+        except PostgrestError as e:
+            status = e.status
+            self._send(e.status, {"message": str(e), "code": e.code, "details": None, "hint": None})
+        except Exception as e:
+            status = 500
+            self._send(500, {"message": str(e), "code": "XX000", "details": None, "hint": None})
+        finally:
+            self.server.record(self.command, table, status, time.perf_counter() - started)
+        return status
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+
+class LocalPostgrest:
+    """Threaded local server exposing LocalDatabase at <url>/rest/v1/<table>"""
+
+    def __init__(self, db_path: str = ":memory:", host: str = "127.0.0.1", port: int = 0,
+                 max_rows: int | None = 1000):
+        self.server = ThreadingHTTPServer((host, port), PostgrestHandler)
+        self.server.database = LocalDatabase(db_path)
+        self.server.max_rows = max_rows  # Supabase's default API row limit
+        self.server.request_log = []
+        self.server.record = lambda *entry: self.server.request_log.append(entry)
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def database(self) -> LocalDatabase:
+        return self.server.database
+
+    @property
+    def request_log(self) -> list:
+        """(method, table, status, seconds) for every request served"""
+        return self.server.request_log
+
+    def start(self) -> "LocalPostgrest":
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "LocalPostgrest":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local PostgREST stand-in for the 4PLAY pipelines")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--db", default=":memory:", help="SQLite file (default: in-memory)")
+    args = parser.parse_args()
+
+    server = LocalPostgrest(args.db, args.host, args.port)
+    print(f"🗄️  Local PostgREST stand-in listening on {server.url}")
+    print(f"   SUPABASE_URL={server.url}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
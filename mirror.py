@@ -0,0 +1,235 @@
+"""
+4PLAY - Local Mirror
+Keeps a local SQLite copy of games, odds, parlays and parlay_picks in step with
+Supabase, pulling only what changed since the last sync:
+- new and edited games, parlays and parlay_picks by updated_at watermark
+- new odds by created_at watermark
+- price changes and suspensions from the odds_changes feed (seq watermark)
+The diagnostics scripts read it through open_mirror() instead of pulling whole tables.
+
+Usage: python mirror.py [--full] [--db path/to/mirror.db]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from supabase_paging import fetch_all_rows
+
+MIRROR_PATH = Path(__file__).with_name("4play_mirror.db")
+# created_at / updated_at are the writing transaction's start time, so a slow commit can land behind the watermark
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+MIRROR_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+  id TEXT PRIMARY KEY,
+  event_id TEXT,
+  date TEXT,
+  time TEXT,
+  sport TEXT,
+  league TEXT,
+  match TEXT,
+  flashscore_url TEXT,
+  is_available INTEGER,
+  created_at TEXT,
+  updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_games_date ON games(date);
+
+CREATE TABLE IF NOT EXISTS odds (
+  id TEXT PRIMARY KEY,
+  game_id TEXT,
+  event_id TEXT,
+  market TEXT,
+  option TEXT,
+  odd REAL,
+  is_available INTEGER,
+  created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_odds_game_id ON odds(game_id);
+
+CREATE TABLE IF NOT EXISTS parlays (
+  id TEXT PRIMARY KEY,
+  user_id TEXT,
+  created_at TEXT,
+  status TEXT,
+  evaluated_at TEXT,
+  total_odds REAL,
+  updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS parlay_picks (
+  id TEXT PRIMARY KEY,
+  parlay_id TEXT,
+  game_id TEXT,
+  event_id TEXT,
+  odds_id TEXT,
+  market TEXT,
+  option TEXT,
+  odd REAL,
+  result TEXT,
+  created_at TEXT,
+  updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_parlay_picks_parlay_id ON parlay_picks(parlay_id);
+
+CREATE TABLE IF NOT EXISTS odds_changes (
+  seq INTEGER PRIMARY KEY,
+  game_id TEXT,
+  odds_id TEXT,
+  change TEXT,
+  market TEXT,
+  option TEXT,
+  odd REAL,
+  created_at TEXT
+);
+
+-- Watermarks: '<table>.updated_at', 'odds.created_at', 'odds_changes.seq'
+CREATE TABLE IF NOT EXISTS sync_state (
+  name TEXT PRIMARY KEY,
+  value TEXT
+);
+"""
+
+MIRRORED_TABLES = ('games', 'odds', 'parlays', 'parlay_picks', 'odds_changes', 'sync_state')
+
+
+def connect(path: Path = MIRROR_PATH) -> sqlite3.Connection:
+    """Open (creating if needed) the mirror database"""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(MIRROR_SCHEMA)
+    return conn
+
+
+def get_state(conn: sqlite3.Connection, name: str) -> str | None:
+    row = conn.execute("SELECT value FROM sync_state WHERE name = ?", (name,)).fetchone()
+    return row['value'] if row else None
+
+
+def set_state(conn: sqlite3.Connection, name: str, value):
+    if value is None:
+        return
+    conn.execute("INSERT OR REPLACE INTO sync_state (name, value) VALUES (?, ?)", (name, str(value)))
+
+
+def upsert_rows(conn: sqlite3.Connection, table: str, rows: list) -> int:
+    """Insert or replace rows, keeping only the columns the mirror has"""
+    if not rows:
+        return 0
+    columns = [col['name'] for col in conn.execute(f"PRAGMA table_info({table})")]
+    quoted = ",".join(f'"{c}"' for c in columns)
+    conn.executemany(
+        f"INSERT OR REPLACE INTO {table} ({quoted}) VALUES ({','.join('?' * len(columns))})",
+        [[row.get(c) for c in columns] for row in rows],
+    )
+    return len(rows)
+
+
+def since(watermark: str | None) -> str:
+    """Lower bound for the next pull, overlapping the previous one a little"""
+    if watermark is None:
+        return "1970-01-01T00:00:00+00:00"
+    return (datetime.fromisoformat(watermark) - WATERMARK_OVERLAP).isoformat()
+
+
+def latest(rows: list, column: str, current: str | None) -> str | None:
+    """Newest timestamp among the rows (or the current watermark)"""
+    stamps = [row[column] for row in rows if row.get(column)]
+    if current:
+        stamps.append(current)
+    return max(stamps, key=datetime.fromisoformat) if stamps else None
+
+
+def sync_rows(conn: sqlite3.Connection, client, table: str, column: str) -> int:
+    """Pull rows whose `column` timestamp moved past the table's watermark"""
+    name = f"{table}.{column}"
+    watermark = get_state(conn, name)
+    rows = fetch_all_rows(lambda: client.table(table).select('*')
+                          .gte(column, since(watermark))
+                          .order(column).order('id'))
+    upsert_rows(conn, table, rows)
+    set_state(conn, name, latest(rows, column, watermark))
+    return len(rows)
+
+
+def sync_odds_changes(conn: sqlite3.Connection, client) -> int:
+    """Pull the odds_changes feed and apply it to the mirrored odds and games"""
+    last_seq = int(get_state(conn, 'odds_changes.seq') or 0)
+    changes = fetch_all_rows(lambda: client.table('odds_changes').select('*').gt('seq', last_seq).order('seq'))
+    upsert_rows(conn, 'odds_changes', changes)
+
+    # Applied in feed order, so each row ends at its latest state
+    for change in changes:
+        kind = change['change']
+        if kind in ('price', 'suspended', 'resumed'):
+            conn.execute(
+                "UPDATE odds SET odd = ?, is_available = ? WHERE id = ?",
+                (change['odd'], int(kind != 'suspended'), change['odds_id']),
+            )
+        elif kind in ('locked', 'unlocked'):
+            conn.execute(
+                "UPDATE games SET is_available = ? WHERE id = ?",
+                (int(kind == 'unlocked'), change['game_id']),
+            )
+
+    set_state(conn, 'odds_changes.seq', changes[-1]['seq'] if changes else None)
+    return len(changes)
+
+
+def sync(conn: sqlite3.Connection, client, full: bool = False) -> dict:
+    """Bring the mirror up to date; `full` drops everything and pulls it again"""
+    if full:
+        for table in MIRRORED_TABLES:
+            conn.execute(f"DELETE FROM {table}")
+
+    counts = {}
+    # Rows first, then the feed on top of them, so odds mutations always land on a mirrored row
+    counts['games'] = sync_rows(conn, client, 'games', 'updated_at')
+    counts['odds'] = sync_rows(conn, client, 'odds', 'created_at')
+    counts['odds_changes'] = sync_odds_changes(conn, client)
+    for table in ('parlays', 'parlay_picks'):
+        counts[table] = sync_rows(conn, client, table, 'updated_at')
+
+    conn.commit()
+    return counts
+
+
+def get_client():
+    """Service-role Supabase client from the environment"""
+    from dotenv import load_dotenv
+    from supabase import create_client
+
+    load_dotenv()
+    return create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_SERVICE_KEY'))
+
+
+def open_mirror(path: Path = MIRROR_PATH, client=None) -> sqlite3.Connection:
+    """Incrementally sync the mirror and return a connection to it"""
+    conn = connect(path)
+    sync(conn, client or get_client())
+    return conn
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="Sync the local SQLite mirror of the 4PLAY database")
+    parser.add_argument("--db", type=Path, default=MIRROR_PATH, help="Mirror file (default: 4play_mirror.db)")
+    parser.add_argument("--full", action="store_true", help="Drop the mirror and pull everything again")
+    args = parser.parse_args()
+
+    print(f"🔄 Syncing mirror {args.db}...")
+    conn = connect(args.db)
+    counts = sync(conn, get_client(), full=args.full)
+    for table, count in counts.items():
+        print(f"   {table}: {count} rows pulled")
+
+    totals = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in MIRRORED_TABLES[:-1]}
+    print("✅ Mirror up to date: " + ", ".join(f"{count} {table}" for table, count in totals.items()))
+
+
+if __name__ == "__main__":
+    main()
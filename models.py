@@ -0,0 +1,183 @@
+"""
+4PLAY - Domain Model
+Compact records shared by the upload and evaluation pipelines.
+Slotted dataclasses with interned repeated strings (sport, league, market, option...),
+plus codecs to and from the scraper JSON files and Supabase rows.
+"""
+
+import json
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from sys import intern
+
+
+def _intern(value: str | None) -> str | None:
+    return intern(value) if value is not None else None
+
+
+def make_event_id(sport: str, date: str, time: str, match: str) -> str:
+    """Event ID for a fixture (the PAF API doesn't give us one); stable across runs"""
+    return f"{sport[:3]}_{date}_{time.replace(':', '')}_{zlib.crc32(match.encode('utf-8')) % 1000000}"
+
+
+def check_game_availability(game_time: str, now: datetime | None = None) -> bool:
+    """Check if game is still available (>2 minutes until start)"""
+    now = now or datetime.now()
+    game_datetime = datetime.combine(now.date(), datetime.strptime(game_time, "%H:%M").time())
+
+    time_until_start = (game_datetime - now).total_seconds() / 60  # minutes
+
+    return time_until_start > 2
+
+
+@dataclass(slots=True)
+class Odd:
+    """One betting option of a game"""
+    market: str
+    option: str
+    odd: float
+    id: str | None = None
+    is_available: bool = True
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Odd":
+        return cls(
+            intern(row['market']), intern(row['option']), float(row['odd']),
+            row.get('id'), row.get('is_available', True),
+        )
+
+    def to_row(self, game_id: str, event_id: str) -> dict:
+        return {
+            'game_id': game_id,
+            'event_id': event_id,
+            'market': self.market,
+            'option': self.option,
+            'odd': self.odd,
+            'is_available': self.is_available,
+        }
+
+
+@dataclass(slots=True)
+class Game:
+    """A fixture and its odds"""
+    event_id: str
+    date: str
+    time: str
+    sport: str
+    league: str
+    match: str
+    odds: list[Odd] = field(default_factory=list)
+    flashscore_url: str | None = None
+    is_available: bool = True
+    id: str | None = None
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Game":
+        return cls(
+            event_id=row['event_id'],
+            date=intern(row['date']),
+            time=intern(row['time']),
+            sport=intern(row['sport']),
+            league=intern(row['league']),
+            match=row['match'],
+            flashscore_url=row.get('flashscore_url'),
+            is_available=row.get('is_available', True),
+            id=row.get('id'),
+        )
+
+    def to_row(self) -> dict:
+        return {
+            'event_id': self.event_id,
+            'date': self.date,
+            'time': self.time,
+            'sport': self.sport,
+            'league': self.league,
+            'match': self.match,
+            'flashscore_url': self.flashscore_url,
+            'is_available': self.is_available,
+        }
+
+
+@dataclass(slots=True)
+class Pick:
+    """One leg of a parlay"""
+    id: str
+    game_id: str
+    event_id: str
+    match: str
+    market: str
+    option: str
+    odd: float
+    result: str | None = None
+    sport: str | None = None
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Pick":
+        """parlay_picks row with an embedded games(match, sport)"""
+        return cls(
+            id=row['id'],
+            game_id=row['game_id'],
+            event_id=row['event_id'],
+            match=intern(row['games']['match']),
+            market=intern(row['market']),
+            option=intern(row['option']),
+            odd=float(row['odd']),
+            result=_intern(row.get('result')),
+            sport=_intern(row['games'].get('sport')),
+        )
+
+    @property
+    def key(self) -> tuple[str, str, str]:
+        """(match, market, option) - how Phase 4 identifies a bet"""
+        return self.match, self.market, self.option
+
+
+@dataclass(slots=True)
+class Parlay:
+    """A user's 4-pick ticket"""
+    id: str
+    user_id: str
+    status: str
+    total_odds: float
+    picks: list[Pick] = field(default_factory=list)
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Parlay":
+        """parlays row with embedded parlay_picks"""
+        return cls(
+            id=row['id'],
+            user_id=row['user_id'],
+            status=intern(row['status']),
+            total_odds=float(row['total_odds']),
+            picks=[Pick.from_row(pick) for pick in row.get('parlay_picks', [])],
+        )
+
+
+def load_games(path: Path) -> list[Game]:
+    """Decode a Phase 1 odds_*.json file straight into Games
+
+    Bets are grouped while the file is parsed, so the per-bet dicts
+    are dropped as soon as they are read.
+    """
+    games = {}
+
+    def decode_bet(bet: dict):
+        key = (bet['date'], bet['time'], bet['match'])
+        game = games.get(key)
+        if game is None:
+            game = games[key] = Game(
+                event_id=make_event_id(bet['sport'], bet['date'], bet['time'], bet['match']),
+                date=intern(bet['date']),
+                time=intern(bet['time']),
+                sport=intern(bet['sport']),
+                league=intern(bet['league']),
+                match=bet['match'],
+            )
+        game.odds.append(Odd(intern(bet['market']), intern(bet['option']), float(bet['odd'])))
+
+    with open(path, 'r', encoding='utf-8') as f:
+        json.load(f, object_hook=decode_bet)
+
+    return list(games.values())
@@ -0,0 +1,314 @@
+"""
+4PLAY - Replay Harness
+Replays archived pipeline artifacts (odds, matched games, results, evaluated bets)
+through the real morning and evening pipelines (run_pipeline, with the Node scrapers
+swapped for the archive) against a local PostgREST stand-in,
+submits synthetic users' parlays through the submit_parlay RPC as a concurrent
+kickoff rush, and reports throughput and latency.
+
+Usage: python replay_harness.py --archive path/to/artifacts --scale 10 --parlays 5000
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from postgrest.exceptions import APIError
+from supabase import create_client
+
+from local_postgrest import LocalPostgrest, user_token
+from models import load_games
+from supabase_paging import fetch_all_rows
+
+ARTIFACT_PREFIXES = ("odds_", "matched_games_", "results_", "evaluated_bets_")
+RUSH_WORKERS = 8  # Concurrent ticket submitters, like the rush just before kickoff
+
+
+def scale_artifacts(archive_dir: Path, output_dir: Path, scale: int):
+    """Copy the latest artifacts, cloning every fixture `scale` times under a new match name"""
+    for prefix in ARTIFACT_PREFIXES:
+        files = sorted(archive_dir.glob(f"{prefix}*.json"), reverse=True)
+        if prefix == "results_":
+            # Keep results/evaluated_bets pairs aligned on their timestamp
+            files = files[:1]
+        elif prefix == "evaluated_bets_":
+            results = sorted(archive_dir.glob("results_*.json"), reverse=True)
+            stamp = results[0].stem.replace("results_", "") if results else None
+            files = [f for f in files if f.stem.replace("evaluated_bets_", "") == stamp]
+        else:
+            files = files[:1]
+
+        for source in files:
+            with open(source, 'r', encoding='utf-8') as f:
+                rows = json.load(f)
+
+            scaled = []
+            for copy in range(scale):
+                for row in rows:
+                    row = dict(row)
+                    if copy and 'match' in row:
+                        row['match'] = f"{row['match']} #{copy}"
+                    scaled.append(row)
+
+            with open(output_dir / source.name, 'w', encoding='utf-8') as f:
+                json.dump(scaled, f)
+
+
+def latest_artifact(directory: Path, prefix: str) -> Path:
+    return sorted(directory.glob(f"{prefix}*.json"), reverse=True)[0]
+
+
+def pick_replay_date(archive_dir: Path) -> datetime:
+    """Use the date with the most fixtures that have a Flashscore URL"""
+    games = load_games(latest_artifact(archive_dir, "odds_"))
+    with open(latest_artifact(archive_dir, "matched_games_"), 'r', encoding='utf-8') as f:
+        matched = {g['match'] for g in json.load(f) if g.get('flashscoreUrl')}
+    dates = Counter(game.date for game in games if game.match in matched)
+    if not dates:
+        dates = Counter(game.date for game in games)
+    return datetime.strptime(dates.most_common(1)[0][0], "%Y-%m-%d")
+
+
+def redirect_paths(upload, evaluate, workdir: Path):
+    """Point every file the pipelines read or write into the work directory"""
+    upload.ODDS_JSON_DIR = workdir / "odds"
+    upload.MATCHED_GAMES_DIR = workdir / "matched"
+    upload.FLASHSCORE_CACHE_FILE = upload.MATCHED_GAMES_DIR / "flashscore_cache.json"
+    upload.UNMATCHED_FIXTURES_FILE = upload.MATCHED_GAMES_DIR / "unmatched_fixtures.json"
+    upload.CHECKPOINT_FILE = workdir / "upload_checkpoint.json"
+    evaluate.RESULTS_DIR = workdir / "results"
+    evaluate.PENDING_FIXTURES_FILE = workdir / "pending_fixtures.json"
+    evaluate.STUCK_FIXTURES_FILE = workdir / "stuck_fixtures.json"
+    for directory in (upload.ODDS_JSON_DIR, upload.MATCHED_GAMES_DIR, evaluate.RESULTS_DIR):
+        directory.mkdir(parents=True, exist_ok=True)
+
+
+class ArchivedScrapers:
+    """Stand-ins for the Node scrapers: write the archived artifacts where the pipelines look for them"""
+
+    def __init__(self, archive_dir: Path, upload, evaluate, seed: int):
+        self.archive_dir = archive_dir
+        self.upload = upload
+        self.evaluate = evaluate
+        self.rng = random.Random(seed)
+        self.now = datetime.now()  # Stamp of the files written next (set per stage)
+        self.drift = False  # Resync: drifted prices and some options pulled
+
+    def _load(self, prefix: str) -> list:
+        with open(latest_artifact(self.archive_dir, prefix), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write(self, directory: Path, prefix: str, rows: list):
+        with open(directory / f"{prefix}{self.now:%Y%m%d_%H%M}.json", 'w', encoding='utf-8') as f:
+            json.dump(rows, f)
+
+    def scrape_odds(self):
+        """Phase 1: the archived odds file (drifted for a resync)"""
+        rows = self._load("odds_")
+        if self.drift:
+            rows = [row for row in rows if self.rng.random() >= 0.05]
+            for row in rows:
+                if self.rng.random() < 0.2:
+                    row['odd'] = round(max(1.01, row['odd'] * self.rng.uniform(0.9, 1.1)), 2)
+        self._write(self.upload.ODDS_JSON_DIR, "odds_", rows)
+
+    def match_urls(self, fixtures_file: Path | None = None):
+        """Phase 2: archived matches for just the fixtures in --fixtures"""
+        with open(fixtures_file, 'r', encoding='utf-8') as f:
+            wanted = {fixture['match'] for fixture in json.load(f)}
+        matched = [game for game in self._load("matched_games_") if game['match'] in wanted]
+        self._write(self.upload.MATCHED_GAMES_DIR, "matched_games_", matched)
+
+    def scrape_results(self, hours_ago: float = 3.0, fixtures_file: Path | None = None):
+        """Phases 3 & 4: archived results and evaluations for just the fixtures in --fixtures"""
+        with open(fixtures_file, 'r', encoding='utf-8') as f:
+            wanted = {fixture['match'] for fixture in json.load(f)}
+        self._write(self.evaluate.RESULTS_DIR, "results_",
+                    [result for result in self._load("results_") if result.get('match') in wanted])
+        self._write(self.evaluate.RESULTS_DIR, "evaluated_bets_",
+                    [bet for bet in self._load("evaluated_bets_") if bet['match'] in wanted])
+
+
+def inject_parlays(client, url: str, users: int, parlays: int, seed: int) -> dict:
+    """Create synthetic users and submit 4-pick parlays over the open games through submit_parlay"""
+    rng = random.Random(seed)
+    open_games = {game['id'] for game in fetch_all_rows(lambda: client.table('games').select('id, is_available').order('id')) if game['is_available']}
+    odds_by_game = {}
+    for odd in fetch_all_rows(lambda: client.table('odds').select('id, game_id, is_available').order('id')):
+        if odd['is_available'] and odd['game_id'] in open_games:
+            odds_by_game.setdefault(odd['game_id'], []).append(odd['id'])
+
+    game_ids = list(odds_by_game)
+    if len(game_ids) < 4:
+        print("   ⚠️  Fewer than 4 open games uploaded - no parlays injected")
+        return {'accepted': 0, 'rejected': 0}
+
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    client.table('user_profiles').insert(
+        [{'id': user_id, 'username': f"replay_{i:05d}"} for i, user_id in enumerate(user_ids)]
+    ).execute()
+    tokens = {user_id: user_token(user_id) for user_id in user_ids}
+
+    tickets = [
+        (rng.choice(user_ids), [rng.choice(odds_by_game[g]) for g in rng.sample(game_ids, 4)])
+        for _ in range(parlays)
+    ]
+
+    # One client per worker, switched to each ticket's user like a browser session
+    local = threading.local()
+
+    def submit(ticket) -> bool:
+        user_id, pick_odds_ids = ticket
+        if not hasattr(local, 'client'):
+            local.client = create_client(url, client.supabase_key)
+        local.client.postgrest.auth(tokens[user_id])
+        try:
+            local.client.rpc('submit_parlay', {'pick_odds_ids': pick_odds_ids}).execute()
+            return True
+        except APIError as e:
+            print(f"   ⚠️  Ticket rejected: {e.message}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=RUSH_WORKERS) as pool:
+        accepted = sum(pool.map(submit, tickets))
+    return {'accepted': accepted, 'rejected': parlays - accepted}
+
+
+def run_morning(upload, scrapers: ArchivedScrapers, now: datetime) -> dict:
+    """The morning pipeline, then a --resume of it (which must find the upload complete)"""
+    scrapers.now = now
+    events = upload.run_pipeline(now=now, scrape_odds=scrapers.scrape_odds, match_urls=scrapers.match_urls)
+    upload.run_pipeline(resume=True, now=now, scrape_odds=scrapers.scrape_odds, match_urls=scrapers.match_urls)
+    return {'fixtures': len(events), 'bets': sum(len(e.odds) for e in events)}
+
+
+def run_resync(upload, scrapers: ArchivedScrapers, now: datetime) -> dict:
+    """The morning pipeline again later in the day, with drifted prices and some options pulled"""
+    scrapers.now = now
+    scrapers.drift = True
+    feed_start = feed_size(upload.supabase)
+    upload.run_pipeline(now=now, scrape_odds=scrapers.scrape_odds, match_urls=scrapers.match_urls)
+    return {'feed_rows': feed_size(upload.supabase) - feed_start}
+
+
+def feed_size(client) -> int:
+    """Number of rows in the odds_changes feed"""
+    return client.table('odds_changes').select('seq', count='exact').limit(1).execute().count
+
+
+def run_evening(evaluate, scrapers: ArchivedScrapers, now: datetime) -> dict:
+    """The evening pipeline; returns parlay id -> status"""
+    scrapers.now = now
+    return evaluate.run_pipeline(now=now, scrape_results=scrapers.scrape_results)
+
+
+def latency_report(request_log: list, since: int) -> list:
+    """Summarise server-side latency per method/table for requests after `since`"""
+    groups = {}
+    for method, table, status, seconds in request_log[since:]:
+        groups.setdefault(f"{method} {table}", []).append(seconds * 1000)
+
+    lines = []
+    for key, samples in sorted(groups.items()):
+        samples.sort()
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        lines.append(
+            f"      {key:<28} n={len(samples):<6} p50={statistics.median(samples):7.2f}ms "
+            f"p95={p95:7.2f}ms max={samples[-1]:7.2f}ms"
+        )
+    return lines
+
+
+def run_stage(name: str, server: LocalPostgrest, quiet: bool, func, *args):
+    """Run one pipeline stage, timing it and collecting its request latencies"""
+    print(f"\n▶️  {name}")
+    log_start = len(server.request_log)
+    output = io.StringIO() if quiet else sys.stdout
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        result = func(*args)
+    elapsed = time.perf_counter() - started
+    requests = len(server.request_log) - log_start
+    print(f"   ⏱️  {elapsed:.2f}s, {requests} requests ({requests / elapsed if elapsed else 0:.0f} req/s)")
+    for line in latency_report(server.request_log, log_start):
+        print(line)
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay archived artifacts through both pipelines offline")
+    parser.add_argument("--archive", required=True, type=Path, help="Directory with odds_/matched_games_/results_/evaluated_bets_ JSON files")
+    parser.add_argument("--scale", type=int, default=1, help="Clone every fixture N times (e.g. 10 for a 10x match day)")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--parlays", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=4)
+    parser.add_argument("--db", default=":memory:", help="SQLite file for the stand-in (default: in-memory)")
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline output")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="4play_replay_"))
+    with LocalPostgrest(args.db) as server:
+        # The pipeline modules read their credentials at import time
+        os.environ['SUPABASE_URL'] = server.url
+        os.environ['SUPABASE_SERVICE_KEY'] = "local-replay"
+        upload = importlib.import_module("upload_odds_to_supabase")
+        evaluate = importlib.import_module("evaluate_parlays")
+
+        print("=" * 60)
+        print("4PLAY - Replay Harness")
+        print("=" * 60)
+
+        try:
+            archive_dir = workdir / "archive"
+            archive_dir.mkdir()
+            scale_artifacts(args.archive, archive_dir, args.scale)
+            redirect_paths(upload, evaluate, workdir)
+            scrapers = ArchivedScrapers(archive_dir, upload, evaluate, args.seed)
+
+            replay_date = pick_replay_date(archive_dir)
+            print(f"   Stand-in: {server.url}")
+            print(f"   Replaying {replay_date.date()} at {args.scale}x scale")
+
+            morning, morning_seconds = run_stage("Morning upload (+ --resume)", server, not args.verbose, run_morning,
+                                                 upload, scrapers, replay_date)
+            injected, inject_seconds = run_stage("Kickoff rush (submit_parlay)", server, not args.verbose,
+                                                 inject_parlays, upload.supabase, server.url, args.users, args.parlays,
+                                                 args.seed)
+            resync, resync_seconds = run_stage("Midday resync", server, not args.verbose, run_resync,
+                                               upload, scrapers, replay_date + timedelta(hours=18, minutes=30))
+            evening, evening_seconds = run_stage("Evening evaluation", server, not args.verbose, run_evening,
+                                                 evaluate, scrapers, replay_date + timedelta(hours=23, minutes=30))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    outcomes = Counter(evening.values())
+    print("\n📊 Replay Summary:")
+    print(f"   Fixtures: {morning['fixtures']}, bets: {morning['bets']}")
+    print(f"   Upload throughput: {morning['bets'] / morning_seconds:.0f} bets/s")
+    print(f"   Resync: {resync['feed_rows']} feed rows in {resync_seconds:.2f}s")
+    print(f"   Submission throughput: {injected['accepted'] / inject_seconds if inject_seconds else 0:.0f} parlays/s "
+          f"({RUSH_WORKERS} concurrent users, {injected['rejected']} rejected)")
+    print(f"   Evaluation throughput: {len(evening) / evening_seconds if evening_seconds else 0:.0f} parlays/s")
+    print(f"   Parlays seen by evaluator: {len(evening)} of {injected['accepted']} submitted")
+    print(f"   Won: {outcomes['won']}, Lost: {outcomes['lost']}, Void: {outcomes['void']}, "
+          f"Still pending: {outcomes['pending']}")
+    print(f"   End-to-end: {morning_seconds + inject_seconds + resync_seconds + evening_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
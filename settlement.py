@@ -0,0 +1,302 @@
+"""
+4PLAY - Market Settlement Engine
+Settles odds directly from final (and period) scores in the Phase 3 results,
+one vectorized pass over every odd of every finished game
+
+Supported markets: 1X2 / Match Odds, Double Chance, Over/Under totals,
+2-way handicaps (whole-number lines only when marked Asian) and Both Teams
+To Score, for full time, regular time and single periods/halves.
+Football markets settle on the 90 minutes; extra time and penalties only count in
+hockey's full time. Anything else is left unsettled.
+"""
+
+import re
+
+import numpy as np
+
+# Settlement codes
+UNSETTLED = -1
+LOST = 0
+WON = 1
+VOID = 2  # Stake returned (e.g. total exactly on a whole-number line)
+
+RESULT_LABELS = {WON: 'WON', LOST: 'LOST', VOID: 'VOID'}
+
+# Market kinds
+MATCH_ODDS, DOUBLE_CHANCE, TOTAL, HANDICAP, BTTS = range(1, 6)
+
+# Selections
+HOME, DRAW, AWAY, OVER, UNDER, YES, NO, HOME_OR_DRAW, HOME_OR_AWAY, DRAW_OR_AWAY = range(10)
+
+# Score scopes (which part of the game a market is about)
+FULL, REGULAR, PERIOD_1, PERIOD_2, PERIOD_3 = range(5)
+N_SCOPES = 5
+
+UNSUPPORTED_MARKET_WORDS = ('player', 'team', ' by ', 'corner', 'card', 'shot', 'correct', 'exact', 'odd/even', 'race to', 'first', 'last')
+# 3-way (European) handicaps have a handicap draw, so a whole-number line loses instead of pushing
+THREE_WAY_HANDICAP_WORDS = ('3-way', '3 way', 'three way', 'european')
+UNFINISHED_STATUS_WORDS = ('postponed', 'cancel', 'abandon', 'interrupt', 'live', 'scheduled', 'delayed')
+CALLED_OFF_STATUS_WORDS = ('postponed', 'cancel', 'abandon')  # Picks on these games are void
+OVERTIME_STATUS_WORDS = ('overtime', 'extra time', 'penalties', 'aet', 'after et', 'ot', 'so')
+REGULAR_PERIODS = {'Football': 2, 'Ice Hockey': 3}  # Halves / periods before any overtime
+OVERTIME_IN_FULL_TIME = {'Ice Hockey'}  # Elsewhere 'Full Time' means regular time
+
+SIDE_OPTIONS = {
+    '1': HOME, 'x': DRAW, 'draw': DRAW, '2': AWAY,
+    'yes': YES, 'no': NO,
+    '1x': HOME_OR_DRAW, '12': HOME_OR_AWAY, 'x2': DRAW_OR_AWAY,
+}
+TOTAL_OPTION = re.compile(r'^(over|under)\s*\(?([0-9]+(?:\.[0-9]+)?)?\)?$', re.IGNORECASE)
+HANDICAP_OPTION = re.compile(r'^(1|2)\s*\(?([+-]?[0-9]+(?:\.[0-9]+)?)\)?$')
+MARKET_LINE = re.compile(r'([0-9]+\.[0-9]+)')
+
+
+def split_teams(match: str) -> tuple[str, str]:
+    """'Home - Away' -> ('Home', 'Away')"""
+    home, _, away = match.partition(' - ')
+    return home.strip(), away.strip()
+
+
+def market_scope(market: str) -> int:
+    """Which part of the game a market settles on"""
+    name = market.lower()
+    if '1st half' in name or '1st period' in name:
+        return PERIOD_1
+    if '2nd half' in name or '2nd period' in name:
+        return PERIOD_2
+    if '3rd period' in name:
+        return PERIOD_3
+    if 'regular time' in name:
+        return REGULAR
+    return FULL
+
+
+def market_kind(market: str) -> int | None:
+    """Classify a market name, or None if the engine can't settle it"""
+    name = market.lower()
+    if 'both teams to score' in name:
+        return BTTS
+    if any(word in name for word in UNSUPPORTED_MARKET_WORDS):
+        return None
+    if 'double chance' in name:
+        return DOUBLE_CHANCE
+    if 'handicap' in name or 'spread' in name:
+        return None if any(word in name for word in THREE_WAY_HANDICAP_WORDS) else HANDICAP
+    if 'total' in name or 'over/under' in name:
+        return TOTAL
+    if name.startswith(('full time', 'match odds', '1x2', 'match result', 'moneyline', '1st half', '2nd half', '1st period', '2nd period', '3rd period')):
+        return MATCH_ODDS
+    return None
+
+
+def parse_selection(market: str, option: str) -> tuple[int, int, float, int] | None:
+    """Parse (market, option) into (kind, side, line, scope); team names must already be 1/2"""
+    kind = market_kind(market)
+    if kind is None:
+        return None
+    option = option.strip()
+    scope = market_scope(market)
+
+    if kind == TOTAL:
+        found = TOTAL_OPTION.match(option)
+        line = found and (found.group(2) or next(iter(MARKET_LINE.findall(market)), None))
+        if not line:
+            return None
+        line = float(line)
+        if (line * 4) % 2:  # Quarter lines split the stake - not representable
+            return None
+        return kind, OVER if found.group(1).lower() == 'over' else UNDER, line, scope
+
+    if kind == HANDICAP:
+        found = HANDICAP_OPTION.match(option)
+        if not found:
+            return None
+        line = float(found.group(2))
+        if (line * 4) % 2:
+            return None
+        # A whole-number line only pushes in an Asian handicap; unlabelled ones may be 3-way
+        if line.is_integer() and 'asian' not in market.lower():
+            return None
+        return kind, HOME if found.group(1) == '1' else AWAY, line, scope
+
+    side = SIDE_OPTIONS.get(option.lower())
+    if side is None:
+        return None
+    if kind == MATCH_ODDS and side not in (HOME, DRAW, AWAY):
+        return None
+    if kind == DOUBLE_CHANCE and side not in (HOME_OR_DRAW, HOME_OR_AWAY, DRAW_OR_AWAY):
+        return None
+    if kind == BTTS and side not in (YES, NO):
+        return None
+    return kind, side, 0.0, scope
+
+
+def _score_pair(value) -> tuple[float, float] | None:
+    """Read a score given as {'home': h, 'away': a}, [h, a] or 'h-a'"""
+    if isinstance(value, dict):
+        value = (value.get('home'), value.get('away'))
+    elif isinstance(value, str):
+        value = re.split(r'\s*[-:]\s*', value.strip())
+    try:
+        home, away = value
+        return float(home), float(away)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_called_off(result: dict) -> bool:
+    """Postponed, cancelled or abandoned - the game won't be settled on its score"""
+    status = str(result.get('status') or '').lower()
+    return any(word in status for word in CALLED_OFF_STATUS_WORDS)
+
+
+def game_scores(result: dict, sport: str | None = None) -> np.ndarray | None:
+    """(N_SCOPES, 2) home/away goals for one result, NaN where unknown; None if not finished"""
+    status = str(result.get('status') or '').lower()
+    if any(word in status for word in UNFINISHED_STATUS_WORDS):
+        return None
+
+    if 'homeScore' in result and 'awayScore' in result:
+        final = _score_pair((result['homeScore'], result['awayScore']))
+    else:
+        final = _score_pair(result.get('score') or result.get('finalScore'))
+    if final is None:
+        return None
+
+    scores = np.full((N_SCOPES, 2), np.nan)
+    scores[FULL] = final
+
+    # Without the sport, periods can't be told apart from overtime - only the status is trusted
+    sport = result.get('sport') or sport
+    n_regular = REGULAR_PERIODS.get(sport, 0)
+    periods = [p for p in map(_score_pair, result.get('periods') or []) if p is not None]
+    for scope, period in zip((PERIOD_1, PERIOD_2, PERIOD_3), periods[:n_regular]):
+        scores[scope] = period
+
+    if n_regular and len(periods) >= n_regular:
+        scores[REGULAR] = np.sum(periods[:n_regular], axis=0)
+    elif not any(re.search(rf'\b{word}\b', status) for word in OVERTIME_STATUS_WORDS):
+        scores[REGULAR] = final
+
+    if sport in REGULAR_PERIODS and sport not in OVERTIME_IN_FULL_TIME:
+        scores[FULL] = scores[REGULAR]
+
+    return scores
+
+
+def settle_odds(odds: list, results: list) -> np.ndarray:
+    """Settle odds rows ({'match', 'market', 'option'}, optional 'sport') against results; returns a code per row"""
+    n = len(odds)
+    codes = np.full(n, UNSETTLED, dtype=np.int8)
+    if n == 0:
+        return codes
+
+    # Per-game scores: (games, scopes, home/away)
+    sports = {odd['match']: odd['sport'] for odd in odds if odd.get('sport')}
+    match_index = {}
+    scores = []
+    overtime = []
+    for result in results:
+        game = game_scores(result, sports.get(result.get('match')))
+        if game is not None and result.get('match') not in match_index:
+            match_index[result['match']] = len(scores)
+            scores.append(game)
+            overtime.append(np.isnan(game[REGULAR, 0]))
+    if not scores:
+        return codes
+    scores = np.array(scores)
+    overtime = np.array(overtime)
+
+    # Parse each distinct (market, option) once; team names are mapped to 1/2 first
+    selections = {}
+    game_idx = np.full(n, -1)
+    selection_idx = np.zeros(n, dtype=np.int64)
+    parsed = [None]
+    for i, odd in enumerate(odds):
+        g = match_index.get(odd['match'])
+        if g is None:
+            continue
+        home, away = split_teams(odd['match'])
+        option = {home: '1', away: '2'}.get(odd['option'], odd['option'])
+        for name, code in ((home, '1'), (away, '2')):
+            if name and option.startswith(name + ' '):
+                option = code + option[len(name):]
+        key = (odd['market'], option)
+        if key not in selections:
+            selections[key] = len(parsed)
+            parsed.append(parse_selection(*key))
+        if parsed[selections[key]] is not None:
+            game_idx[i] = g
+            selection_idx[i] = selections[key]
+
+    rows = np.flatnonzero(game_idx >= 0)
+    if rows.size == 0:
+        return codes
+
+    table = np.array([p if p is not None else (0, 0, 0.0, 0) for p in parsed], dtype=float)
+    kind, side, line, scope = table[selection_idx[rows]].T
+    kind, side, scope = kind.astype(int), side.astype(int), scope.astype(int)
+    g = game_idx[rows]
+
+    home = scores[g, scope, 0]
+    away = scores[g, scope, 1]
+    diff = home - away
+    total = home + away
+    # A regular-time result is a draw whenever the game went to overtime (football's full time too)
+    regular_draw = np.isin(scope, (FULL, REGULAR)) & np.isnan(home) & overtime[g]
+    diff = np.where(regular_draw, 0.0, diff)
+
+    # Margin > 0 won, == 0 void, < 0 lost, NaN unsettled
+    win_loss = lambda won: np.where(won, 1.0, -1.0)
+    margin = np.select(
+        [
+            (kind == MATCH_ODDS) & (side == HOME),
+            (kind == MATCH_ODDS) & (side == DRAW),
+            (kind == MATCH_ODDS) & (side == AWAY),
+            (kind == DOUBLE_CHANCE) & (side == HOME_OR_DRAW),
+            (kind == DOUBLE_CHANCE) & (side == HOME_OR_AWAY),
+            (kind == DOUBLE_CHANCE) & (side == DRAW_OR_AWAY),
+            (kind == TOTAL) & (side == OVER),
+            (kind == TOTAL) & (side == UNDER),
+            (kind == HANDICAP) & (side == HOME),
+            (kind == HANDICAP) & (side == AWAY),
+            (kind == BTTS) & (side == YES),
+            (kind == BTTS) & (side == NO),
+        ],
+        [
+            win_loss(diff > 0),
+            win_loss(diff == 0),
+            win_loss(diff < 0),
+            win_loss(diff >= 0),
+            win_loss(diff != 0),
+            win_loss(diff <= 0),
+            total - line,
+            line - total,
+            diff + line,
+            line - diff,
+            win_loss((home > 0) & (away > 0)),
+            win_loss((home == 0) | (away == 0)),
+        ],
+        default=np.nan,
+    )
+
+    # Unknown scores stay unsettled (comparisons against NaN are False, so re-mask)
+    unknown = np.isnan(diff) | (np.isnan(total) & ~np.isin(kind, (MATCH_ODDS, DOUBLE_CHANCE, HANDICAP)))
+    margin[unknown] = np.nan
+
+    codes[rows] = np.select(
+        [np.isnan(margin), margin > 0, margin < 0],
+        [UNSETTLED, WON, LOST],
+        default=VOID,
+    )
+    return codes
+
+
+def settle_to_evaluated_bets(odds: list, results: list) -> list:
+    """Settle odds rows into the evaluated_bets_*.json shape (settled rows only)"""
+    codes = settle_odds(odds, results)
+    return [
+        {'match': odd['match'], 'market': odd['market'], 'option': odd['option'], 'result': RESULT_LABELS[code]}
+        for odd, code in zip(odds, codes.tolist())
+        if code != UNSETTLED
+    ]
@@ -0,0 +1,301 @@
+"""
+4PLAY - Parlay Suggestions
+Finds the top-N 4-pick parlays (one pick per game) for the day's odds,
+ranked by a score and kept inside a target total-odds band
+
+Each odd gets a fair probability with the bookmaker margin removed, then a
+branch-and-bound search over per-game candidate lists keeps the best N in a
+min-heap. Subtrees are pruned with suffix bounds: the best score the remaining
+games can add while still landing the total odds inside the band (a small DP
+over a log-odds grid). The last leg is picked from all remaining games at once.
+Results are cached on disk per odds snapshot.
+
+Usage: python suggest_parlays.py --min-odds 5 --max-odds 20 --score value --top 10 --main-markets
+"""
+
+import argparse
+import heapq
+import json
+import math
+import re
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from models import Game, check_game_availability, load_games
+from settlement import SIDE_OPTIONS, market_kind
+from upload_checkpoint import file_checksum
+
+# Paths
+ODDS_DIR = Path("C:/Users/35844/Parlay/odds")
+ODDS_JSON_DIR = ODDS_DIR / "Scraped_odds_json"
+SUGGESTIONS_CACHE_DIR = ODDS_DIR / "suggestions_cache"
+
+LEGS = 4
+SCORES = ('value', 'probability')
+# log(probability) = log(expected value) - log(odd): probability gives up one per unit of log-odds
+SCORE_TILT = {'value': 0.0, 'probability': 1.0}
+LINE_OPTION = re.compile(r'^(?:over|under|[12x])\s*\(?([+-]?\d+(?:\.\d+)?)\)?$', re.IGNORECASE)
+
+
+@dataclass(slots=True)
+class Candidate:
+    """One pickable odd with its fair probability and search weights"""
+    match: str
+    market: str
+    option: str
+    odd: float
+    fair_probability: float
+    score: float  # Additive: log of probability or of expected value
+    log_odd: float
+
+
+def book_key(market: str, option: str) -> tuple:
+    """Options priced against each other: same market and same line (Over/Under 2.5, 1 -1.5 / 2 +1.5)
+
+    Plain sides (1, X, 2, 1X, 12...) carry no line, so the whole market is one book.
+    """
+    option = option.strip()
+    found = None if option.lower() in SIDE_OPTIONS else LINE_OPTION.match(option)
+    return market, abs(float(found.group(1))) if found else None
+
+
+def is_open(game: Game, now: datetime) -> bool:
+    """Still accepting picks, by the same kickoff rule as the morning upload"""
+    today = now.date().isoformat()
+    return game.is_available and (game.date > today or (game.date == today and check_game_availability(game.time, now)))
+
+
+def fair_probabilities(odds: list[float]) -> list[float]:
+    """Remove the margin from a complete book, weighting it by the odds (longshots carry more)"""
+    n = len(odds)
+    margin = sum(1 / odd for odd in odds) - 1
+    return [(n - margin * odd) / (n * odd) for odd in odds]
+
+
+def game_candidates(game: Game, score: str, main_markets: bool) -> list[Candidate]:
+    """Pickable odds of one game, best score first"""
+    books = {}
+    for odd in game.odds:
+        if odd.odd <= 1 or (main_markets and market_kind(odd.market) is None):
+            continue
+        books.setdefault(book_key(odd.market, odd.option), []).append(odd)
+
+    candidates = []
+    for book in books.values():
+        # A single option can't be de-margined, and a book under 100% isn't a complete one
+        if len(book) < 2 or sum(1 / odd.odd for odd in book) < 1:
+            continue
+        for odd, probability in zip(book, fair_probabilities([odd.odd for odd in book])):
+            if probability <= 0:
+                continue
+            weight = probability * odd.odd if score == 'value' else probability
+            candidates.append(Candidate(
+                game.match, odd.market, odd.option, odd.odd, probability, math.log(weight), math.log(odd.odd)
+            ))
+
+    candidates.sort(key=lambda c: c.score, reverse=True)
+    return candidates
+
+
+def band_bounds(lists: list[list[Candidate]], hi: float, step: float, tilt: float) -> tuple[list, list, list]:
+    """Best score r legs from games lists[j:] can add, given the log-odds they must still cover
+
+    F[r][j][k]: best sum(score + tilt * log_odd) with sum(log_odd) >= k * step (the band's lower edge)
+    G[r][j][k]: best sum(score) with sum(log_odd) <= k * step (the upper edge)
+    best[r][j]: best sum(score) with no band at all
+    One pick per game, exact up to the grid step; thresholds are rounded so all stay upper bounds.
+    """
+    size = int(math.ceil(hi / step)) + 1
+    grid = np.arange(size) * step
+    n = len(lists)
+    empty = np.full(size, -np.inf)
+
+    lower_base = empty.copy()
+    lower_base[0] = 0.0
+    F = [[lower_base] * (n + 1)] + [[empty] * (n + 1) for _ in range(LEGS)]
+    G = [[np.zeros(size)] * (n + 1)] + [[empty] * (n + 1) for _ in range(LEGS)]
+    best = [[0.0] * (n + 1)] + [[-math.inf] * (n + 1) for _ in range(LEGS)]
+
+    for j in range(n - 1, -1, -1):
+        scores = np.array([c.score for c in lists[j]])[:, None]
+        log_odds = np.array([c.log_odd for c in lists[j]])[:, None]
+        shifted = (grid[None, :] - log_odds) / step
+        # F is non-increasing in its threshold: round the remaining threshold down
+        lower_idx = np.clip(np.floor(shifted).astype(int), 0, size - 1)
+        # G is non-decreasing: round up, and below zero nothing fits
+        upper_idx = np.clip(np.ceil(shifted).astype(int), 0, size - 1)
+        upper_ok = upper_idx >= np.ceil(shifted)
+        for r in range(1, LEGS + 1):
+            take = (scores + tilt * log_odds + F[r - 1][j + 1][lower_idx]).max(axis=0)
+            F[r][j] = np.maximum(F[r][j + 1], take)
+            take = np.where(upper_ok, scores + G[r - 1][j + 1][upper_idx], -np.inf).max(axis=0)
+            G[r][j] = np.maximum(G[r][j + 1], take)
+            best[r][j] = max(best[r][j + 1], lists[j][0].score + best[r - 1][j + 1])
+
+    return [[row.tolist() for row in level] for level in F], [[row.tolist() for row in level] for level in G], best
+
+
+def search(candidate_lists: list[list[Candidate]], min_odds: float, max_odds: float, top: int,
+           tilt: float = 0.0, step: float = 0.005) -> list:
+    """Top `top` combinations of one candidate from each of 4 games, total odds in [min_odds, max_odds]
+
+    `tilt` is the score lost per unit of log-odds: the lower-edge bound works on
+    score + tilt * log_odd, which stays nearly flat so the grid rounding costs little.
+    """
+    lists = sorted((c for c in candidate_lists if c), key=lambda c: c[0].score, reverse=True)
+    lo, hi = math.log(min_odds), math.log(max_odds)
+    F, G, best = band_bounds(lists, hi, step, tilt)
+    last = len(G[0][0]) - 1
+
+    def bound(remaining: int, j: int, log_odd: float) -> float:
+        """Upper bound on what `remaining` legs from lists[j:] add, given the log-odds so far"""
+        need = lo - log_odd
+        room = hi - log_odd
+        if room < 0:
+            return -math.inf
+        # sum(score) = sum(score + tilt * log_odd) - tilt * sum(log_odd), and sum(log_odd) >= need
+        lower = F[remaining][j][int(need / step)] - tilt * need if need > 0 else best[remaining][j]
+        upper = G[remaining][j][min(last, math.ceil(room / step))]
+        return min(lower, upper, best[remaining][j])
+
+    # The last leg is picked from all remaining games at once: candidates flattened in game order
+    flat = [candidate for candidates in lists for candidate in candidates]
+    flat_scores = np.array([c.score for c in flat])
+    flat_log_odds = np.array([c.log_odd for c in flat])
+    offsets = np.cumsum([0] + [len(candidates) for candidates in lists]).tolist()
+
+    heap = []  # (score, tiebreak, picks) - the worst kept combination on top
+    counter = 0
+    cutoff = -math.inf  # Score a combination must beat once the heap is full
+    picks = []
+
+    def finish(start: int, score: float, log_odd: float):
+        """Push the best last legs from lists[start:] for the picks so far"""
+        nonlocal counter, cutoff
+        scores = flat_scores[offsets[start]:]
+        log_odds = flat_log_odds[offsets[start]:]
+        fits = np.flatnonzero((log_odds >= lo - log_odd) & (log_odds <= hi - log_odd) & (scores > cutoff - score))
+        if len(fits) > top:
+            fits = fits[np.argpartition(scores[fits], -top)[-top:]]
+        for i in sorted(fits.tolist(), key=lambda i: scores[i], reverse=True):
+            new_score = score + scores[i]
+            if new_score <= cutoff:
+                break
+            counter += 1
+            entry = (new_score, counter, picks + [flat[offsets[start] + i]])
+            if len(heap) < top:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heapreplace(heap, entry)
+            if len(heap) == top:
+                cutoff = heap[0][0]
+
+    def extend(start: int, score: float, log_odd: float):
+        remaining = LEGS - len(picks)
+        if remaining == 1:
+            finish(start, score, log_odd)
+            return
+        rest = remaining - 1
+        for j in range(start, len(lists) - remaining + 1):
+            # Later games only draw from a subset of these games, so their bound is no better
+            if score + bound(remaining, j, log_odd) <= cutoff:
+                return
+            best_rest = best[rest][j + 1]
+            for candidate in lists[j]:
+                new_score = score + candidate.score
+                if new_score + best_rest <= cutoff:
+                    break  # Candidates are sorted by score
+                new_log = log_odd + candidate.log_odd
+                if new_score + bound(rest, j + 1, new_log) > cutoff:
+                    picks.append(candidate)
+                    extend(j + 1, new_score, new_log)
+                    picks.pop()
+
+    extend(0, 0.0, 0.0)
+    return [combo for _, _, combo in sorted(heap, key=lambda e: (-e[0], e[1]))]
+
+
+def to_suggestion(picks: list[Candidate]) -> dict:
+    total_odds = math.prod(c.odd for c in picks)
+    win_probability = math.prod(c.fair_probability for c in picks)
+    return {
+        'total_odds': round(total_odds, 2),
+        'win_probability': round(win_probability, 6),
+        'expected_value': round(total_odds * win_probability, 4),
+        'picks': [
+            {'match': c.match, 'market': c.market, 'option': c.option, 'odd': c.odd,
+             'fair_probability': round(c.fair_probability, 4)}
+            for c in picks
+        ],
+    }
+
+
+def suggest_parlays(games: list[Game], min_odds: float, max_odds: float, score: str = 'value',
+                    top: int = 10, main_markets: bool = False, now: datetime | None = None) -> list[dict]:
+    """Best `top` 4-game parlays by `score` with total odds in [min_odds, max_odds], from games not yet started"""
+    if score not in SCORES:
+        raise ValueError(f"score must be one of {SCORES}")
+    now = now or datetime.now()
+    playable = [game for game in games if is_open(game, now)]
+    candidate_lists = [game_candidates(game, score, main_markets) for game in playable]
+    return [to_suggestion(picks) for picks in search(candidate_lists, min_odds, max_odds, top, SCORE_TILT[score])]
+
+
+def cached_suggestions(odds_file: Path, today: str, min_odds: float, max_odds: float, score: str,
+                       top: int, main_markets: bool, cache_dir: Path = SUGGESTIONS_CACHE_DIR,
+                       now: datetime | None = None) -> list[dict]:
+    """Suggestions for an odds snapshot, from the disk cache when this exact query has run before"""
+    now = now or datetime.now()
+    games = [game for game in load_games(odds_file) if game.date == today]
+    # The set of open games only changes at a kickoff, so the earliest open kickoff marks the cutoff
+    cutoff = min((f"{game.date}T{game.time}" for game in games if is_open(game, now)), default="closed")
+    key = (f"{file_checksum(odds_file)[:16]}_{today}_{cutoff.replace(':', '')}_{score}_{min_odds:g}-{max_odds:g}"
+           f"_{top}{'_main' if main_markets else ''}")
+    cache_file = cache_dir / f"{key}.json"
+    if cache_file.exists():
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    suggestions = suggest_parlays(games, min_odds, max_odds, score, top, main_markets, now)
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with open(cache_file, 'w', encoding='utf-8') as f:
+        json.dump(suggestions, f, ensure_ascii=False, indent=2)
+    return suggestions
+
+
+def main():
+    sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="Suggest the best 4-pick parlays for today's odds")
+    parser.add_argument("--min-odds", type=float, default=5.0)
+    parser.add_argument("--max-odds", type=float, default=20.0)
+    parser.add_argument("--score", choices=SCORES, default='value',
+                        help="value: expected return at fair odds; probability: chance all 4 win")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--main-markets", action="store_true", help="Only markets the settlement engine understands")
+    parser.add_argument("--odds-file", type=Path, help="Phase 1 odds file (default: latest)")
+    parser.add_argument("--date", default=datetime.now().date().isoformat(), help="Game date (default: today)")
+    args = parser.parse_args()
+
+    odds_file = args.odds_file or sorted(ODDS_JSON_DIR.glob("odds_*.json"), reverse=True)[0]
+    print(f"🎯 Suggesting parlays from {odds_file.name} ({args.score}, odds {args.min_odds:g}-{args.max_odds:g})")
+
+    started = time.perf_counter()
+    suggestions = cached_suggestions(odds_file, args.date, args.min_odds, args.max_odds,
+                                     args.score, args.top, args.main_markets)
+    print(f"   {len(suggestions)} suggestions in {(time.perf_counter() - started) * 1000:.1f}ms\n")
+
+    for rank, suggestion in enumerate(suggestions, 1):
+        print(f"{rank:>2}. @ {suggestion['total_odds']:.2f} - win {suggestion['win_probability']:.1%}, "
+              f"EV {suggestion['expected_value']:.3f}")
+        for pick in suggestion['picks']:
+            print(f"      {pick['match']}: {pick['market']} - {pick['option']} @ {pick['odd']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+-- 4PLAY Betting App - Migrations for an existing database
+-- supabase_schema.sql creates a fresh database; this file brings one created from an
+-- earlier version of it up to date. Every statement is idempotent, so re-running is safe.
+-- Run this first, then re-run the FUNCTIONS section of supabase_schema.sql
+-- (functions are CREATE OR REPLACE, triggers are dropped and recreated).
+
+-- ============================================
+-- Tickets only through submit_parlay
+-- ============================================
+
+DROP POLICY IF EXISTS "Users can insert their own parlays" ON parlays;
+DROP POLICY IF EXISTS "Users can update their own parlays" ON parlays;
+DROP POLICY IF EXISTS "Users can insert their own parlay picks" ON parlay_picks;
+REVOKE INSERT, UPDATE, DELETE ON parlays, parlay_picks FROM anon, authenticated;
+
+-- ============================================
+-- Odds change feed and in-place board sync
+-- ============================================
+
+ALTER TABLE odds ADD COLUMN IF NOT EXISTS is_available BOOLEAN NOT NULL DEFAULT true;
+
+-- The upload now upserts by (game_id, market, option), so duplicates must go before the
+-- unique index. Keep the newest row of each option and move picks onto it first -
+-- deleting an odd cascades to the picks that reference it.
+DROP TABLE IF EXISTS duplicate_odds;
+CREATE TEMP TABLE duplicate_odds AS
+SELECT id, keep_id
+FROM (
+  SELECT
+    id,
+    FIRST_VALUE(id) OVER (PARTITION BY game_id, market, option ORDER BY created_at DESC, id) AS keep_id
+  FROM odds
+) ranked
+WHERE id <> keep_id;
+
+UPDATE parlay_picks pp
+SET odds_id = d.keep_id
+FROM duplicate_odds d
+WHERE pp.odds_id = d.id;
+
+DELETE FROM odds o
+USING duplicate_odds d
+WHERE o.id = d.id;
+
+DROP TABLE duplicate_odds;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_odds_game_market_option ON odds(game_id, market, option);
+
+CREATE TABLE IF NOT EXISTS odds_changes (
+  seq BIGSERIAL PRIMARY KEY,
+  game_id UUID NOT NULL REFERENCES games(id) ON DELETE CASCADE,
+  odds_id UUID REFERENCES odds(id) ON DELETE CASCADE,
+  change TEXT NOT NULL CHECK (change IN ('game_added', 'locked', 'unlocked', 'added', 'price', 'suspended', 'resumed')),
+  market TEXT,
+  option TEXT,
+  odd DECIMAL(10, 2),
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_odds_changes_game_id ON odds_changes(game_id);
+
+ALTER TABLE odds_changes ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Odds changes are viewable by everyone" ON odds_changes;
+CREATE POLICY "Odds changes are viewable by everyone"
+  ON odds_changes FOR SELECT
+  USING (true);
+
+GRANT SELECT ON odds_changes TO anon, authenticated;
+
+-- ============================================
+-- Legacy 'pending' pick results
+-- ============================================
+
+-- The old web app inserted picks with result 'pending'; unsettled is NULL everywhere now
+UPDATE parlay_picks SET result = NULL WHERE result = 'pending';
+
+-- ============================================
+-- Void results
+-- ============================================
+
+ALTER TABLE parlays DROP CONSTRAINT IF EXISTS parlays_status_check;
+ALTER TABLE parlays ADD CONSTRAINT parlays_status_check
+  CHECK (status IN ('pending', 'won', 'lost', 'void'));
+
+-- Needs the 'pending' clean-up above. The old IN (..., NULL) form let any string through
+ALTER TABLE parlay_picks DROP CONSTRAINT IF EXISTS parlay_picks_result_check;
+ALTER TABLE parlay_picks ADD CONSTRAINT parlay_picks_result_check
+  CHECK (result IS NULL OR result IN ('won', 'lost', 'void'));
+
+-- ============================================
+-- updated_at watermark for the local mirror
+-- ============================================
+
+ALTER TABLE games ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE parlays ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE parlay_picks ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+
+CREATE INDEX IF NOT EXISTS idx_games_updated_at ON games(updated_at);
+CREATE INDEX IF NOT EXISTS idx_parlays_updated_at ON parlays(updated_at);
+CREATE INDEX IF NOT EXISTS idx_parlay_picks_updated_at ON parlay_picks(updated_at);
@@ -0,0 +1,16 @@
+"""
+4PLAY - Supabase Paging
+PostgREST caps every response at PAGE_SIZE rows, so whole-table reads page past it
+"""
+
+PAGE_SIZE = 1000  # Supabase's default max-rows
+
+
+def fetch_all_rows(build_query) -> list:
+    """Page through a query past the max-rows limit; build_query returns a fresh, ordered query"""
+    rows = []
+    while True:
+        page = build_query().range(len(rows), len(rows) + PAGE_SIZE - 1).execute().data
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
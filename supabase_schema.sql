@@ -19,12 +19,14 @@ CREATE TABLE games (
   match TEXT NOT NULL,
   flashscore_url TEXT,
   is_available BOOLEAN DEFAULT true,
-  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
 CREATE INDEX idx_games_event_id ON games(event_id);
 CREATE INDEX idx_games_date ON games(date);
 CREATE INDEX idx_games_sport ON games(sport);
+CREATE INDEX idx_games_updated_at ON games(updated_at);
 
 -- 2. Odds table - all betting markets and options
 CREATE TABLE odds (
@@ -34,26 +36,30 @@ CREATE TABLE odds (
   market TEXT NOT NULL,
   option TEXT NOT NULL,
   odd DECIMAL(10, 2) NOT NULL,
+  is_available BOOLEAN NOT NULL DEFAULT true,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
 CREATE INDEX idx_odds_game_id ON odds(game_id);
 CREATE INDEX idx_odds_event_id ON odds(event_id);
 CREATE INDEX idx_odds_market ON odds(market);
+CREATE UNIQUE INDEX idx_odds_game_market_option ON odds(game_id, market, option);
 
 -- 3. Parlays table - user parlay submissions
 CREATE TABLE parlays (
   id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
   user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-  status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'won', 'lost')),
+  status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'won', 'lost', 'void')),
   evaluated_at TIMESTAMP WITH TIME ZONE,
-  total_odds DECIMAL(10, 2) NOT NULL
+  total_odds DECIMAL(10, 2) NOT NULL,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
 CREATE INDEX idx_parlays_user_id ON parlays(user_id);
 CREATE INDEX idx_parlays_status ON parlays(status);
 CREATE INDEX idx_parlays_created_at ON parlays(created_at DESC);
+CREATE INDEX idx_parlays_updated_at ON parlays(updated_at);
 
 -- 4. Parlay picks table - individual picks in a parlay
 CREATE TABLE parlay_picks (
@@ -65,13 +71,15 @@ CREATE TABLE parlay_picks (
   market TEXT NOT NULL,
   option TEXT NOT NULL,
   odd DECIMAL(10, 2) NOT NULL,
-  result TEXT CHECK (result IN ('won', 'lost', NULL)),
-  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+  result TEXT CHECK (result IS NULL OR result IN ('won', 'lost', 'void')),
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
 CREATE INDEX idx_parlay_picks_parlay_id ON parlay_picks(parlay_id);
 CREATE INDEX idx_parlay_picks_game_id ON parlay_picks(game_id);
 CREATE INDEX idx_parlay_picks_event_id ON parlay_picks(event_id);
+CREATE INDEX idx_parlay_picks_updated_at ON parlay_picks(updated_at);
 
 -- 5. User profiles table - extended user data
 CREATE TABLE user_profiles (
@@ -83,6 +91,21 @@ CREATE TABLE user_profiles (
 
 CREATE INDEX idx_user_profiles_username ON user_profiles(username);
 
+-- 6. Odds changes table - sequence-numbered feed of board changes
+-- Written by triggers on games/odds; clients catch up with seq > last seen
+CREATE TABLE odds_changes (
+  seq BIGSERIAL PRIMARY KEY,
+  game_id UUID NOT NULL REFERENCES games(id) ON DELETE CASCADE,
+  odds_id UUID REFERENCES odds(id) ON DELETE CASCADE,
+  change TEXT NOT NULL CHECK (change IN ('game_added', 'locked', 'unlocked', 'added', 'price', 'suspended', 'resumed')),
+  market TEXT,
+  option TEXT,
+  odd DECIMAL(10, 2),
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX idx_odds_changes_game_id ON odds_changes(game_id);
+
 -- ============================================
 -- VIEWS
 -- ============================================
@@ -118,6 +141,7 @@ ALTER TABLE odds ENABLE ROW LEVEL SECURITY;
 ALTER TABLE parlays ENABLE ROW LEVEL SECURITY;
 ALTER TABLE parlay_picks ENABLE ROW LEVEL SECURITY;
 ALTER TABLE user_profiles ENABLE ROW LEVEL SECURITY;
+ALTER TABLE odds_changes ENABLE ROW LEVEL SECURITY;
 
 -- Games policies (public read)
 CREATE POLICY "Games are viewable by everyone"
@@ -129,19 +153,18 @@ CREATE POLICY "Odds are viewable by everyone"
   ON odds FOR SELECT
   USING (true);
 
+-- Odds changes policies (public read)
+CREATE POLICY "Odds changes are viewable by everyone"
+  ON odds_changes FOR SELECT
+  USING (true);
+
 -- Parlays policies
+-- Read-only for users: tickets are only written by submit_parlay (SECURITY DEFINER),
+-- so its validation can't be skipped with a direct insert
 CREATE POLICY "Users can view their own parlays"
   ON parlays FOR SELECT
   USING (auth.uid() = user_id);
 
-CREATE POLICY "Users can insert their own parlays"
-  ON parlays FOR INSERT
-  WITH CHECK (auth.uid() = user_id);
-
-CREATE POLICY "Users can update their own parlays"
-  ON parlays FOR UPDATE
-  USING (auth.uid() = user_id);
-
 -- Parlay picks policies
 CREATE POLICY "Users can view their own parlay picks"
   ON parlay_picks FOR SELECT
@@ -153,16 +176,6 @@ CREATE POLICY "Users can view their own parlay picks"
     )
   );
 
-CREATE POLICY "Users can insert their own parlay picks"
-  ON parlay_picks FOR INSERT
-  WITH CHECK (
-    EXISTS (
-      SELECT 1 FROM parlays
-      WHERE parlays.id = parlay_picks.parlay_id
-      AND parlays.user_id = auth.uid()
-    )
-  );
-
 -- User profiles policies
 CREATE POLICY "User profiles are viewable by everyone"
   ON user_profiles FOR SELECT
@@ -194,26 +207,212 @@ END;
 $$ LANGUAGE plpgsql SECURITY DEFINER;
 
 -- Trigger to create profile on new user signup
+DROP TRIGGER IF EXISTS on_auth_user_created ON auth.users;
 CREATE TRIGGER on_auth_user_created
   AFTER INSERT ON auth.users
   FOR EACH ROW EXECUTE FUNCTION public.handle_new_user();
 
--- Function to calculate parlay total odds
+-- Function to calculate parlay total odds (void picks count as 1.00)
 CREATE OR REPLACE FUNCTION calculate_parlay_total_odds(parlay_uuid UUID)
 RETURNS DECIMAL AS $$
+  SELECT ROUND(COALESCE(EXP(SUM(LN(odd)) FILTER (WHERE result IS DISTINCT FROM 'void')), 1), 2)
+  FROM parlay_picks
+  WHERE parlay_id = parlay_uuid;
+$$ LANGUAGE sql STABLE;
+
+-- Function to void postponed / abandoned games in one pass
+-- Marks their unsettled picks void, then recomputes total odds and status of every
+-- affected pending parlay: any lost -> lost, all void -> void, all won or void -> won
+-- Returns the number of parlays updated
+CREATE OR REPLACE FUNCTION void_games(game_uuids UUID[])
+RETURNS INTEGER AS $$
 DECLARE
-  total DECIMAL := 1.0;
-  pick_odd DECIMAL;
+  updated INTEGER;
 BEGIN
-  FOR pick_odd IN
-    SELECT odd FROM parlay_picks WHERE parlay_id = parlay_uuid
-  LOOP
-    total := total * pick_odd;
-  END LOOP;
-  RETURN ROUND(total, 2);
+  UPDATE games SET is_available = false
+  WHERE id = ANY(game_uuids) AND is_available;
+
+  -- 'pending' is how the old web app stored unsettled picks
+  UPDATE parlay_picks SET result = 'void'
+  WHERE game_id = ANY(game_uuids) AND (result IS NULL OR result = 'pending');
+
+  UPDATE parlays p
+  SET
+    total_odds = t.total_odds,
+    status = t.status,
+    evaluated_at = CASE WHEN t.status <> 'pending' THEN NOW() END
+  FROM (
+    SELECT
+      pp.parlay_id,
+      ROUND(COALESCE(EXP(SUM(LN(pp.odd)) FILTER (WHERE pp.result IS DISTINCT FROM 'void')), 1), 2) AS total_odds,
+      CASE
+        WHEN COUNT(*) FILTER (WHERE pp.result = 'lost') > 0 THEN 'lost'
+        WHEN COUNT(*) FILTER (WHERE pp.result = 'void') = COUNT(*) THEN 'void'
+        WHEN COUNT(*) FILTER (WHERE pp.result IN ('won', 'void')) = COUNT(*) THEN 'won'
+        ELSE 'pending'
+      END AS status
+    FROM parlay_picks pp
+    WHERE pp.parlay_id IN (
+      SELECT parlay_id FROM parlay_picks WHERE game_id = ANY(game_uuids) AND result = 'void'
+    )
+    GROUP BY pp.parlay_id
+  ) t
+  WHERE p.id = t.parlay_id AND p.status = 'pending';
+
+  GET DIAGNOSTICS updated = ROW_COUNT;
+  RETURN updated;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Only the evening pipeline (service role) may void games
+REVOKE EXECUTE ON FUNCTION void_games(UUID[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION void_games(UUID[]) TO service_role;
+
+-- Function to submit a 4-pick parlay in a single call
+-- Validates the picks and inserts the parlay + picks atomically
+CREATE OR REPLACE FUNCTION submit_parlay(pick_odds_ids UUID[])
+RETURNS parlays AS $$
+DECLARE
+  new_parlay parlays;
+  pick_count INTEGER;
+  game_count INTEGER;
+  open_count INTEGER;
+  total DECIMAL;
+BEGIN
+  IF auth.uid() IS NULL THEN
+    RAISE EXCEPTION 'You must be logged in to submit a ticket';
+  END IF;
+
+  IF cardinality(pick_odds_ids) <> 4 THEN
+    RAISE EXCEPTION 'A ticket needs exactly 4 picks';
+  END IF;
+
+  -- One pass over the picked odds: distinct games, availability and total odds
+  SELECT
+    COUNT(DISTINCT o.id),
+    COUNT(DISTINCT o.game_id),
+    COUNT(*) FILTER (WHERE g.is_available AND o.is_available),
+    ROUND(EXP(SUM(LN(o.odd))), 2)
+  INTO pick_count, game_count, open_count, total
+  FROM odds o
+  JOIN games g ON g.id = o.game_id
+  WHERE o.id = ANY(pick_odds_ids);
+
+  IF pick_count <> 4 THEN
+    RAISE EXCEPTION 'One or more picks are no longer offered';
+  END IF;
+
+  IF game_count <> 4 THEN
+    RAISE EXCEPTION 'All 4 picks must be from different games';
+  END IF;
+
+  IF open_count <> 4 THEN
+    RAISE EXCEPTION 'One or more games have already started';
+  END IF;
+
+  INSERT INTO parlays (user_id, status, total_odds)
+  VALUES (auth.uid(), 'pending', total)
+  RETURNING * INTO new_parlay;
+
+  INSERT INTO parlay_picks (parlay_id, game_id, event_id, odds_id, market, option, odd)
+  SELECT new_parlay.id, o.game_id, o.event_id, o.id, o.market, o.option, o.odd
+  FROM odds o
+  WHERE o.id = ANY(pick_odds_ids);
+
+  RETURN new_parlay;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+GRANT EXECUTE ON FUNCTION submit_parlay(UUID[]) TO authenticated;
+
+-- Odds change feed: log every price change, suspension and lock
+-- Also sent as NOTIFY odds_changes for listeners that don't want to poll
+CREATE OR REPLACE FUNCTION log_odds_change()
+RETURNS TRIGGER AS $$
+DECLARE
+  change_type TEXT;
+  new_seq BIGINT;
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    change_type := 'added';
+  ELSIF NEW.is_available IS DISTINCT FROM OLD.is_available THEN
+    change_type := CASE WHEN NEW.is_available THEN 'resumed' ELSE 'suspended' END;
+  ELSIF NEW.odd IS DISTINCT FROM OLD.odd THEN
+    change_type := 'price';
+  ELSE
+    RETURN NEW;
+  END IF;
+
+  INSERT INTO odds_changes (game_id, odds_id, change, market, option, odd)
+  VALUES (NEW.game_id, NEW.id, change_type, NEW.market, NEW.option, NEW.odd)
+  RETURNING seq INTO new_seq;
+
+  PERFORM pg_notify('odds_changes', json_build_object(
+    'seq', new_seq, 'game_id', NEW.game_id, 'odds_id', NEW.id, 'change', change_type, 'odd', NEW.odd
+  )::text);
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION log_game_change()
+RETURNS TRIGGER AS $$
+DECLARE
+  change_type TEXT;
+  new_seq BIGINT;
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    change_type := 'game_added';
+  ELSIF NEW.is_available IS DISTINCT FROM OLD.is_available THEN
+    change_type := CASE WHEN NEW.is_available THEN 'unlocked' ELSE 'locked' END;
+  ELSE
+    RETURN NEW;
+  END IF;
+
+  INSERT INTO odds_changes (game_id, change)
+  VALUES (NEW.id, change_type)
+  RETURNING seq INTO new_seq;
+
+  PERFORM pg_notify('odds_changes', json_build_object(
+    'seq', new_seq, 'game_id', NEW.id, 'change', change_type
+  )::text);
+  RETURN NEW;
 END;
 $$ LANGUAGE plpgsql;
 
+DROP TRIGGER IF EXISTS on_odds_changed ON odds;
+CREATE TRIGGER on_odds_changed
+  AFTER INSERT OR UPDATE OF odd, is_available ON odds
+  FOR EACH ROW EXECUTE FUNCTION log_odds_change();
+
+DROP TRIGGER IF EXISTS on_game_changed ON games;
+CREATE TRIGGER on_game_changed
+  AFTER INSERT OR UPDATE OF is_available ON games
+  FOR EACH ROW EXECUTE FUNCTION log_game_change();
+
+-- Stamp updated_at on every edit, so incremental readers (mirror.py) see in-place changes
+CREATE OR REPLACE FUNCTION touch_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.updated_at := NOW();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS on_game_updated ON games;
+CREATE TRIGGER on_game_updated
+  BEFORE UPDATE ON games
+  FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+DROP TRIGGER IF EXISTS on_parlay_updated ON parlays;
+CREATE TRIGGER on_parlay_updated
+  BEFORE UPDATE ON parlays
+  FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+DROP TRIGGER IF EXISTS on_parlay_pick_updated ON parlay_picks;
+CREATE TRIGGER on_parlay_pick_updated
+  BEFORE UPDATE ON parlay_picks
+  FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
 -- ============================================
 -- SAMPLE DATA (for testing - remove in production)
 -- ============================================
@@ -227,6 +426,8 @@ VALUES
 */
 
 -- Grant necessary permissions to authenticated users
+-- Reads everywhere (RLS decides which rows); writes only to their own profile - tickets go through submit_parlay
 GRANT USAGE ON SCHEMA public TO authenticated;
-GRANT ALL ON ALL TABLES IN SCHEMA public TO authenticated;
-GRANT ALL ON ALL SEQUENCES IN SCHEMA public TO authenticated;
+GRANT SELECT ON ALL TABLES IN SCHEMA public TO authenticated;
+GRANT INSERT, UPDATE ON user_profiles TO authenticated;
+REVOKE INSERT, UPDATE, DELETE ON parlays, parlay_picks FROM anon, authenticated;
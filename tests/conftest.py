@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The pipeline modules are flat scripts in the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,86 @@
+"""settle_odds verdicts - these decide payouts, so every market rule gets a case"""
+
+import pytest
+
+from settlement import LOST, UNSETTLED, VOID, WON, settle_odds
+
+MATCH = 'Home - Away'
+
+
+def settle(market: str, option: str, home: int, away: int, status: str = 'Finished', periods=None,
+           sport: str | None = None) -> int:
+    result = {'match': MATCH, 'homeScore': home, 'awayScore': away, 'status': status}
+    if periods is not None:
+        result['periods'] = periods
+    odd = {'match': MATCH, 'market': market, 'option': option, 'sport': sport}
+    return int(settle_odds([odd], [result])[0])
+
+
+@pytest.mark.parametrize('option, expected', [('1', WON), ('X', LOST), ('2', LOST)])
+def test_match_odds(option, expected):
+    assert settle('Full Time', option, 2, 1) == expected
+
+
+@pytest.mark.parametrize('option, expected', [('1X', WON), ('12', LOST), ('X2', WON)])
+def test_double_chance(option, expected):
+    assert settle('Double Chance', option, 1, 1) == expected
+
+
+@pytest.mark.parametrize('option, expected', [('Over 2.5', WON), ('Under 2.5', LOST), ('Over 4', VOID), ('Under 4', VOID)])
+def test_totals(option, expected):
+    assert settle('Total Goals', option, 3, 1) == expected
+
+
+@pytest.mark.parametrize('option, expected', [('1 (-1.5)', WON), ('2 (+1.5)', LOST), ('1 (-2.5)', LOST)])
+def test_half_line_handicap(option, expected):
+    assert settle('Handicap', option, 3, 1) == expected
+
+
+def test_asian_handicap_whole_line_pushes():
+    assert settle('Asian Handicap', '1 (-2)', 3, 1) == VOID
+
+
+@pytest.mark.parametrize('market', ['3-Way Handicap', 'European Handicap', 'Handicap'])
+def test_possible_three_way_handicap_is_not_settled(market):
+    # In a 3-way handicap 1 (-2) on a 3-1 result loses to the handicap draw - never refund it
+    assert settle(market, '1 (-2)', 3, 1) == UNSETTLED
+
+
+def test_regular_time_draw_after_overtime():
+    assert settle('Match Odds - Regular Time', 'X', 3, 2, status='After Overtime') == WON
+
+
+# 1-1 after 90 minutes, 2-1 after extra time: football markets settle on the 90 minutes
+@pytest.mark.parametrize('market, option, expected', [
+    ('Match Odds - Regular Time', 'X', WON),
+    ('Full Time', 'X', WON),
+    ('Full Time', '1', LOST),
+    ('Total Goals', 'Under 2.5', WON),
+])
+def test_football_extra_time_with_periods(market, option, expected):
+    periods = ['1-0', '0-1', '1-0']
+    assert settle(market, option, 2, 1, status='After Extra Time', periods=periods, sport='Football') == expected
+
+
+@pytest.mark.parametrize('market, option, expected', [
+    ('Match Odds - Regular Time', 'X', WON),
+    ('Full Time', '1', LOST),
+    ('Total Goals', 'Over 2.5', UNSETTLED),  # Regular-time goals unknown
+    ('Total Goals', 'Under 2.5', UNSETTLED),
+])
+def test_football_extra_time_without_periods(market, option, expected):
+    assert settle(market, option, 2, 1, status='After Extra Time', sport='Football') == expected
+
+
+@pytest.mark.parametrize('market, option, expected', [
+    ('Full Time', '1', WON),
+    ('Match Odds - Regular Time', 'X', WON),
+    ('Total Goals - Regular Time', 'Over 4.5', LOST),
+])
+def test_hockey_overtime_counts_in_full_time_only(market, option, expected):
+    periods = ['1-0', '0-1', '1-1', '1-0']
+    assert settle(market, option, 3, 2, status='After Overtime', periods=periods, sport='Ice Hockey') == expected
+
+
+def test_called_off_game_is_not_settled():
+    assert settle('Full Time', '1', 0, 0, status='Postponed') == UNSETTLED
@@ -0,0 +1,52 @@
+"""search() against brute-force enumeration - the bounds prune, they must never change the answer"""
+
+import itertools
+import math
+import random
+
+import pytest
+
+from suggest_parlays import LEGS, SCORE_TILT, SCORES, Candidate, search
+
+
+def random_slate(rng: random.Random, score: str) -> list[list[Candidate]]:
+    slate = []
+    for g in range(rng.randint(LEGS, 7)):
+        candidates = []
+        for c in range(rng.randint(1, 5)):
+            odd = round(rng.uniform(1.05, 6.0), 2)
+            probability = rng.uniform(0.8, 1.05) / odd
+            weight = probability * odd if score == 'value' else probability
+            candidates.append(Candidate(f"Home{g} - Away{g}", 'Full Time', str(c), odd, probability,
+                                        math.log(weight), math.log(odd)))
+        candidates.sort(key=lambda c: c.score, reverse=True)
+        slate.append(candidates)
+    return slate
+
+
+def brute_force(slate: list, min_odds: float, max_odds: float, top: int) -> list[float]:
+    lo, hi = math.log(min_odds), math.log(max_odds)
+    scores = [
+        sum(c.score for c in combo)
+        for games in itertools.combinations(slate, LEGS)
+        for combo in itertools.product(*games)
+        if lo <= sum(c.log_odd for c in combo) <= hi
+    ]
+    return sorted(scores, reverse=True)[:top]
+
+
+@pytest.mark.parametrize('score', SCORES)
+@pytest.mark.parametrize('seed', range(40))
+def test_search_matches_brute_force(score, seed):
+    rng = random.Random(seed)
+    slate = random_slate(rng, score)
+    min_odds = rng.uniform(3, 15)
+    max_odds = min_odds * rng.uniform(1.2, 4)
+    top = rng.randint(1, 10)
+
+    found = search(slate, min_odds, max_odds, top, tilt=SCORE_TILT[score])
+
+    assert all(len({c.match for c in combo}) == LEGS for combo in found)
+    assert all(min_odds <= math.prod(c.odd for c in combo) * (1 + 1e-9) for combo in found)
+    assert all(math.prod(c.odd for c in combo) <= max_odds * (1 + 1e-9) for combo in found)
+    assert [sum(c.score for c in combo) for combo in found] == pytest.approx(brute_force(slate, min_odds, max_odds, top))
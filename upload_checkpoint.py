@@ -0,0 +1,66 @@
+"""
+4PLAY - Upload Checkpoints
+Records which games the morning upload has fully synced, tied to the checksum
+of the odds file being uploaded, so an interrupted run can resume where it stopped
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+CHECKPOINT_VERSION = 1
+
+
+def file_checksum(path: Path) -> str:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def new_checkpoint(artifact: Path, checksum: str, date_str: str) -> dict:
+    """Empty checkpoint for an upload of `artifact`"""
+    return {
+        'version': CHECKPOINT_VERSION,
+        'artifact': artifact.name,
+        'checksum': checksum,
+        'date': date_str,
+        'games': {},  # match -> game_id, for games whose game row and odds are all written
+        'complete': False,
+    }
+
+
+def load_checkpoint(path: Path, checksum: str, date_str: str) -> dict | None:
+    """Checkpoint for this artifact and date, or None if there is no usable one"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if checkpoint.get('version') != CHECKPOINT_VERSION:
+        print(f"   ⚠️  Checkpoint version {checkpoint.get('version')} != {CHECKPOINT_VERSION}, ignoring it")
+        return None
+    if checkpoint['checksum'] != checksum or checkpoint['date'] != date_str:
+        print(f"   ⚠️  Checkpoint is for {checkpoint['artifact']} ({checkpoint['date']}), not the latest odds file")
+        return None
+
+    return checkpoint
+
+
+def save_checkpoint(checkpoint: dict, path: Path):
+    """Write the checkpoint atomically"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def mark_synced(checkpoint: dict, path: Path, match: str, game_id: str):
+    """Record a fully synced game and persist the checkpoint"""
+    checkpoint['games'][match] = game_id
+    save_checkpoint(checkpoint, path)
@@ -7,14 +7,25 @@ import sys
 import io
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
+import argparse
 import json
 import subprocess
+import time
+from collections import Counter
 from datetime import datetime, timedelta
 from pathlib import Path
 import os
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
+from models import Game, Odd, check_game_availability, load_games
+from supabase_paging import fetch_all_rows
+from flashscore_cache import (
+    MISS_TTL, load_cache, save_cache, update_cache, record_misses, find_uncached, write_fixtures,
+    cached_matched_games
+)
+from upload_checkpoint import file_checksum, new_checkpoint, load_checkpoint, save_checkpoint, mark_synced
+
 # Load environment variables
 load_dotenv()
 
@@ -32,6 +43,9 @@ ODDS_DIR = Path("C:/Users/35844/Parlay/odds")
 FLASH_URLS_DIR = Path("C:/Users/35844/Parlay/Flash_URLs")
 ODDS_JSON_DIR = ODDS_DIR / "Scraped_odds_json"
 MATCHED_GAMES_DIR = FLASH_URLS_DIR / "URL_matching_data"
+FLASHSCORE_CACHE_FILE = MATCHED_GAMES_DIR / "flashscore_cache.json"
+UNMATCHED_FIXTURES_FILE = MATCHED_GAMES_DIR / "unmatched_fixtures.json"
+CHECKPOINT_FILE = ODDS_DIR / "upload_checkpoint.json"
 
 
 def run_phase1_scraper():
@@ -55,11 +69,16 @@ def run_phase1_scraper():
     print(result.stdout)
 
 
-def run_phase2_url_matcher():
+def run_phase2_url_matcher(fixtures_file: Path | None = None):
     """Run Phase 2: URL Matcher to get Flashscore URLs"""
     print("\n🚀 Running Phase 2: URL Matcher...")
+    command = ["node", "match-games-to-urls.js"]
+    if fixtures_file:
+        # Only match the fixtures the cache can't answer
+        command += ["--fixtures", str(fixtures_file)]
+
     result = subprocess.run(
-        ["node", "match-games-to-urls.js"],
+        command,
         cwd=str(FLASH_URLS_DIR),
         capture_output=True,
         text=True,
@@ -87,17 +106,16 @@ def get_latest_file(directory: Path, prefix: str, suffix: str) -> Path:
     return files[0]
 
 
-def load_odds_json() -> list:
-    """Load latest odds JSON from Phase 1"""
+def load_odds_json(latest_odds_file: Path | None = None) -> list[Game]:
+    """Load latest odds JSON from Phase 1, grouped into games"""
     print("\n📂 Loading odds data...")
-    latest_odds_file = get_latest_file(ODDS_JSON_DIR, "odds_", ".json")
+    latest_odds_file = latest_odds_file or get_latest_file(ODDS_JSON_DIR, "odds_", ".json")
     print(f"   Using: {latest_odds_file.name}")
 
-    with open(latest_odds_file, 'r', encoding='utf-8') as f:
-        odds_data = json.load(f)
+    games = load_games(latest_odds_file)
 
-    print(f"   Loaded {len(odds_data)} betting options")
-    return odds_data
+    print(f"   Loaded {sum(len(g.odds) for g in games)} betting options for {len(games)} games")
+    return games
 
 
 def load_matched_games_json() -> list:
@@ -117,179 +135,308 @@ def load_matched_games_json() -> list:
         return []
 
 
-def filter_todays_games(odds_data: list) -> dict:
-    """Filter odds to only include today's games, grouped by event"""
+def filter_todays_games(games: list[Game], today=None) -> list[Game]:
+    """Filter games to only include today's"""
     print("\n🔍 Filtering for today's games...")
 
-    today = datetime.now().date()
+    today = today or datetime.now().date()
     today_str = today.strftime("%Y-%m-%d")
 
-    # Group by unique event (event_id)
-    events = {}
-
-    for bet in odds_data:
-        if bet['date'] != today_str:
-            continue
-
-        # Create unique event key
-        event_key = f"{bet['date']}|{bet['time']}|{bet['match']}"
-
-        if event_key not in events:
-            # Use a simple hash as event_id (or derive from PAF API if available)
-            event_id = f"{bet['sport'][:3]}_{bet['date']}_{bet['time'].replace(':', '')}_{hash(bet['match']) % 1000000}"
-
-            events[event_key] = {
-                'event_id': event_id,
-                'date': bet['date'],
-                'time': bet['time'],
-                'sport': bet['sport'],
-                'league': bet['league'],
-                'match': bet['match'],
-                'odds': []
-            }
-
-        events[event_key]['odds'].append(bet)
+    events = [game for game in games if game.date == today_str]
 
     print(f"   Found {len(events)} unique games for today")
     return events
 
 
-def check_game_availability(game_time: str) -> bool:
-    """Check if game is still available (>2 minutes until start)"""
-    now = datetime.now()
-    game_datetime = datetime.combine(datetime.now().date(), datetime.strptime(game_time, "%H:%M").time())
-
-    time_until_start = (game_datetime - now).total_seconds() / 60  # minutes
-
-    return time_until_start > 2
-
-
-def match_flashscore_url(match_name: str, matched_games: list) -> str | None:
-    """Find Flashscore URL for a game by matching team names"""
+def index_flashscore_urls(matched_games: list) -> dict:
+    """Map match name -> Flashscore URL (first match wins)"""
+    urls = {}
     for game in matched_games:
-        if game['match'] == match_name:
-            return game.get('flashscoreUrl')
-    return None
+        urls.setdefault(game['match'], game.get('flashscoreUrl'))
+    return urls
+
+
+def fetch_board(today_str: str) -> dict[str, Game]:
+    """Today's games already in the database with all their odds, keyed by match"""
+    board = {}
+    for row in fetch_all_rows(lambda: supabase.table('games').select('*').eq('date', today_str).order('id')):
+        game = Game.from_row(row)
+        game.time = game.time[:5]  # TIME columns come back as HH:MM:SS
+        board[game.match] = game
+
+    games_by_id = {game.id: game for game in board.values()}
+    game_ids = list(games_by_id)
+    for i in range(0, len(game_ids), 100):
+        chunk = game_ids[i:i + 100]
+        rows = fetch_all_rows(lambda: supabase.table('odds')
+                              .select('id, game_id, market, option, odd, is_available')
+                              .in_('game_id', chunk).order('id'))
+        for row in rows:
+            games_by_id[row['game_id']].odds.append(Odd.from_row(row))
+
+    return board
+
+
+def unique_odds(odds: list[Odd]) -> list[Odd]:
+    """Drop repeated (market, option) pairs, keeping the first price"""
+    seen = {}
+    for odd in odds:
+        seen.setdefault((odd.market, odd.option), odd)
+    return list(seen.values())
+
+
+def diff_odds(event: Game, existing: Game) -> tuple[list, list, Counter]:
+    """Split a game's fresh odds into new rows and in-place updates against what is stored"""
+    stored = {(odd.market, odd.option): odd for odd in existing.odds}
+    new_rows = []
+    updated_rows = []
+    changes = Counter()
+
+    for odd in event.odds:
+        old = stored.pop((odd.market, odd.option), None)
+        if old is None:
+            new_rows.append(odd.to_row(event.id, event.event_id))
+            changes['added'] += 1
+            continue
+        odd.id = old.id
+        if not old.is_available:
+            changes['resumed'] += 1
+        elif round(old.odd, 2) != round(odd.odd, 2):
+            changes['price'] += 1
+        else:
+            continue
+        updated_rows.append({'id': old.id, **odd.to_row(event.id, event.event_id)})
 
+    # Options the bookmaker no longer offers are suspended, not deleted (picks may reference them)
+    for old in stored.values():
+        if old.is_available:
+            old.is_available = False
+            updated_rows.append({'id': old.id, **old.to_row(event.id, event.event_id)})
+            changes['suspended'] += 1
 
-def upload_to_supabase(events: dict, matched_games: list):
-    """Upload games and odds to Supabase"""
-    import time
+    return new_rows, updated_rows, changes
 
-    print("\n📤 Uploading to Supabase...")
 
-    # Clear today's games first (this will cascade delete odds due to foreign key)
-    today_str = datetime.now().date().strftime("%Y-%m-%d")
-    supabase.table('games').delete().eq('date', today_str).execute()
-    print("   Cleared existing games for today")
+def write_with_retry(write, label: str, max_retries: int = 3) -> bool:
+    """Run a Supabase write, retrying transient failures"""
+    for attempt in range(1, max_retries + 1):
+        try:
+            write()
+            return True
+        except Exception as e:
+            if attempt == max_retries:
+                print(f"   ❌ Failed to {label} after {max_retries} retries - {e}")
+                return False
+            print(f"   ⚠️  Retry {attempt}/{max_retries} to {label}")
+            time.sleep(2)  # Wait 2 seconds before retrying
+
+
+def write_odds(new_rows: list, updated_rows: list, match: str) -> int:
+    """Insert new odds and upsert changed ones in batches; returns rows written"""
+    BATCH_SIZE = 100
+    written = 0
+    for rows, upsert in ((new_rows, False), (updated_rows, True)):
+        for i in range(0, len(rows), BATCH_SIZE):
+            batch = rows[i:i + BATCH_SIZE]
+            if upsert:
+                write = lambda: supabase.table('odds').upsert(batch, on_conflict='id').execute()
+            else:
+                write = lambda: supabase.table('odds').insert(batch).execute()
+            if write_with_retry(write, f"write odds batch for {match}"):
+                written += len(batch)
+    return written
+
+
+def upload_to_supabase(events: list[Game], matched_games: list, now: datetime | None = None,
+                       checkpoint: dict | None = None, checkpoint_file: Path = CHECKPOINT_FILE):
+    """Sync today's games and odds to Supabase in place
+
+    Rows keep their IDs across runs, so users' picks survive a re-run and every
+    price change, suspension and lock lands in the odds_changes feed (via triggers).
+    With a checkpoint, games it already lists are skipped and each fully written
+    game is added to it.
+    """
+    print("\n📤 Syncing to Supabase...")
+    now = now or datetime.now()
+
+    today_str = now.date().strftime("%Y-%m-%d")
+    board = fetch_board(today_str)
+    print(f"   {len(board)} games already on today's board")
 
-    games_uploaded = 0
     games_skipped = 0
-    odds_uploaded = 0
-    BATCH_SIZE = 100  # Insert odds in batches
+    games_resumed = 0
+    games_failed = 0
+    totals = Counter()
+    flashscore_urls = index_flashscore_urls(matched_games)
+    if checkpoint and checkpoint['games']:
+        print(f"   Resuming: {len(checkpoint['games'])} games already synced by the interrupted run")
+
+    for event in events:
+        existing = board.pop(event.match, None)
+        if checkpoint and event.match in checkpoint['games']:
+            games_resumed += 1
+            continue
+        event.odds = unique_odds(event.odds)
 
-    for event_key, event in events.items():
         # Check if game is available
-        is_available = check_game_availability(event['time'])
+        event.is_available = check_game_availability(event.time, now)
 
-        # Find Flashscore URL
-        flashscore_url = match_flashscore_url(event['match'], matched_games)
+        # Find Flashscore URL (a game already on the board keeps the one it has)
+        event.flashscore_url = flashscore_urls.get(event.match) or (existing and existing.flashscore_url)
 
         # Skip games without Flashscore URL
-        if not flashscore_url:
+        if not event.flashscore_url:
             games_skipped += 1
-            print(f"   ⏭️  Skipped (no URL) - {event['sport']}: {event['match']}")
-            continue
-
-        # Insert game with retry logic
-        game_data = {
-            'event_id': event['event_id'],
-            'date': event['date'],
-            'time': event['time'],
-            'sport': event['sport'],
-            'league': event['league'],
-            'match': event['match'],
-            'flashscore_url': flashscore_url,
-            'is_available': is_available
-        }
-
-        try:
-            game_response = supabase.table('games').insert(game_data).execute()
-            game_id = game_response.data[0]['id']
-            games_uploaded += 1
-        except Exception as e:
-            print(f"   ❌ Failed to upload game: {event['match']} - {str(e)}")
+            print(f"   ⏭️  Skipped (no URL) - {event.sport}: {event.match}")
             continue
 
-        # Prepare odds data in batches
-        odds_data = []
-        for bet in event['odds']:
-            odd_data = {
-                'game_id': game_id,
-                'event_id': event['event_id'],
-                'market': bet['market'],
-                'option': bet['option'],
-                'odd': float(bet['odd'])
+        if existing is None:
+            try:
+                game_response = supabase.table('games').insert(event.to_row()).execute()
+                event.id = game_response.data[0]['id']
+                totals['games_added'] += 1
+            except Exception as e:
+                print(f"   ❌ Failed to upload game: {event.match} - {str(e)}")
+                games_failed += 1
+                continue
+            new_rows = [odd.to_row(event.id, event.event_id) for odd in event.odds]
+            updated_rows, changes = [], Counter(added=len(new_rows))
+        else:
+            # Keep the stored IDs - parlay picks reference them
+            event.id = existing.id
+            event.event_id = existing.event_id
+            game_changes = {
+                column: value for column, value in event.to_row().items()
+                if column in ('time', 'league', 'flashscore_url', 'is_available') and value != getattr(existing, column)
             }
-            odds_data.append(odd_data)
-
-        # Insert odds in batches
-        for i in range(0, len(odds_data), BATCH_SIZE):
-            batch = odds_data[i:i + BATCH_SIZE]
-            retry_count = 0
-            max_retries = 3
-
-            while retry_count < max_retries:
-                try:
-                    supabase.table('odds').insert(batch).execute()
-                    odds_uploaded += len(batch)
-                    break
-                except Exception as e:
-                    retry_count += 1
-                    if retry_count >= max_retries:
-                        print(f"   ❌ Failed to upload odds batch for {event['match']} after {max_retries} retries")
-                    else:
-                        print(f"   ⚠️  Retry {retry_count}/{max_retries} for {event['match']}")
-                        time.sleep(2)  # Wait 2 seconds before retrying
-
-        status = "🔒 Locked" if not is_available else "✅ Available"
-        print(f"   {status} 🔗 - {event['sport']}: {event['match']} ({len(event['odds'])} odds)")
-
-    print(f"\n✅ Upload complete!")
-    print(f"   Games uploaded: {games_uploaded}")
+            if game_changes:
+                if not write_with_retry(lambda: supabase.table('games').update(game_changes).eq('id', event.id).execute(),
+                                        f"update game {event.match}"):
+                    games_failed += 1
+                    continue
+                totals['games_updated'] += 1
+            new_rows, updated_rows, changes = diff_odds(event, existing)
+
+        written = write_odds(new_rows, updated_rows, event.match)
+        totals['odds_written'] += written
+        totals.update(changes)
+
+        # Only games with every row written are checkpointed; the rest are re-diffed on resume
+        if written < len(new_rows) + len(updated_rows):
+            games_failed += 1
+        elif checkpoint is not None:
+            mark_synced(checkpoint, checkpoint_file, event.match, event.id)
+
+        status = "🔒 Locked" if not event.is_available else "✅ Available"
+        delta = ", ".join(f"{count} {kind}" for kind, count in changes.items()) or "no changes"
+        print(f"   {status} 🔗 - {event.sport}: {event.match} ({len(event.odds)} odds, {delta})")
+
+    # Games that dropped off the slate (usually because they kicked off) are locked
+    vanished = [game.id for game in board.values() if game.is_available]
+    for i in range(0, len(vanished), 100):
+        chunk = vanished[i:i + 100]
+        write_with_retry(lambda: supabase.table('games').update({'is_available': False}).in_('id', chunk).execute(),
+                         "lock games no longer offered")
+    if vanished:
+        print(f"   🔒 Locked {len(vanished)} games no longer offered")
+
+    if checkpoint is not None:
+        checkpoint['complete'] = games_failed == 0
+        save_checkpoint(checkpoint, checkpoint_file)
+
+    print(f"\n✅ Sync complete!" if games_failed == 0 else f"\n⚠️  Sync finished with {games_failed} failed games - rerun with --resume")
+    print(f"   Games added: {totals['games_added']}, updated: {totals['games_updated']}, locked: {len(vanished)}")
     print(f"   Games skipped (no URL): {games_skipped}")
-    print(f"   Odds: {odds_uploaded}")
+    if games_resumed:
+        print(f"   Games already synced (resumed): {games_resumed}")
+    print(f"   Odds added: {totals['added']}, repriced: {totals['price']}, "
+          f"suspended: {totals['suspended']}, resumed: {totals['resumed']}")
+    print(f"   Odds rows written: {totals['odds_written']}")
+
+
+def resolve_flashscore_urls(events: list[Game], games: list[Game], now: datetime | None = None,
+                            match_urls=run_phase2_url_matcher) -> list:
+    """Get Flashscore URLs from the cache, running Phase 2 only for uncached fixtures"""
+    print("\n🗂️  Checking Flashscore cache...")
+    now = now or datetime.now()
+    cache = load_cache(FLASHSCORE_CACHE_FILE)
+    uncached = find_uncached(cache, events, now)
+    print(f"   {len(events) - len(uncached)}/{len(events)} fixtures cached or recently unmatched")
+
+    if uncached:
+        print(f"   {len(uncached)} fixtures need matching")
+        write_fixtures(uncached, UNMATCHED_FIXTURES_FILE)
+        match_urls(UNMATCHED_FIXTURES_FILE)
+        matched_games = load_matched_games_json()
+        added = update_cache(cache, matched_games, games)
+        missed = record_misses(cache, uncached, matched_games, now)
+        save_cache(cache, FLASHSCORE_CACHE_FILE, now.date())
+        print(f"   Cached {added} new fixtures ({missed} unmatched, retried after {MISS_TTL})")
+    else:
+        print("   ⏭️  Skipping Phase 2 - all of today's fixtures are cached")
 
+    return cached_matched_games(cache, events)
 
-def main():
-    """Main pipeline execution"""
+
+def run_pipeline(resume: bool = False, now: datetime | None = None,
+                 scrape_odds=run_phase1_scraper, match_urls=run_phase2_url_matcher) -> list[Game]:
+    """Phases 1 & 2 and the upload; returns today's games
+
+    The scrapers are parameters so the replay harness can stand archived
+    artifacts in for them - every other step runs as in production.
+    """
     print("=" * 60)
     print("4PLAY - Morning Data Pipeline (Phases 1 & 2)")
     print("=" * 60)
+    now = now or datetime.now()
 
     try:
-        # Step 1: Run Phase 1 (API Scraper)
-        run_phase1_scraper()
-
-        # Step 2: Run Phase 2 (URL Matcher)
-        run_phase2_url_matcher()
-
-        # Step 3: Load data
-        odds_data = load_odds_json()
-        matched_games = load_matched_games_json()
-
-        # Step 4: Filter and prepare data
-        todays_events = filter_todays_games(odds_data)
+        # Step 1: Run Phase 1 (API Scraper) - a resume reuses the odds file it produced
+        if not resume:
+            scrape_odds()
+
+        # Step 2: Load and filter odds
+        odds_file = get_latest_file(ODDS_JSON_DIR, "odds_", ".json")
+        games = load_odds_json(odds_file)
+        todays_events = filter_todays_games(games, now.date())
+
+        # Step 3: Checkpoint tied to this exact odds file
+        checksum = file_checksum(odds_file)
+        today_str = now.date().strftime("%Y-%m-%d")
+        if resume:
+            checkpoint = load_checkpoint(CHECKPOINT_FILE, checksum, today_str)
+            if checkpoint is None:
+                raise Exception("No checkpoint for the latest odds file - run without --resume")
+            if checkpoint['complete']:
+                print("\n✅ Upload of this odds file already completed - nothing to resume")
+                return todays_events
+        else:
+            checkpoint = new_checkpoint(odds_file, checksum, today_str)
+            save_checkpoint(checkpoint, CHECKPOINT_FILE)
+
+        # Step 4: Run Phase 2 (URL Matcher) only for fixtures missing from the cache
+        # (also on resume - the interrupted run may have stopped inside Phase 2)
+        matched_games = resolve_flashscore_urls(todays_events, games, now, match_urls)
 
         # Step 5: Upload to Supabase
-        upload_to_supabase(todays_events, matched_games)
+        upload_to_supabase(todays_events, matched_games, now=now, checkpoint=checkpoint, checkpoint_file=CHECKPOINT_FILE)
 
         print("\n🎉 Pipeline complete! Data is ready for 4PLAY app.")
+        return todays_events
 
     except Exception as e:
         print(f"\n❌ Pipeline failed: {e}")
         raise
 
 
+def main():
+    """Main pipeline execution"""
+    parser = argparse.ArgumentParser(description="4PLAY morning pipeline: scrape odds and sync them to Supabase")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted upload of the latest odds file (the odds scraper is skipped)")
+    args = parser.parse_args()
+    run_pipeline(resume=args.resume)
+
+
 if __name__ == "__main__":
     main()
@@ -2,42 +2,38 @@ import sys
 import io
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
-from dotenv import load_dotenv
-import os
-from supabase import create_client
-from collections import Counter
+from mirror import open_mirror
 
-load_dotenv()
-supabase = create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_SERVICE_KEY'))
+db = open_mirror()
 
 print("="*60)
 print("4PLAY Database Verification")
 print("="*60)
 
 # Get games count
-games_result = supabase.table('games').select('id, sport, match', count='exact').execute()
-print(f'\n✅ Total games: {games_result.count}')
+games = db.execute('SELECT id, sport, match FROM games').fetchall()
+print(f'\n✅ Total games: {len(games)}')
 
 # Count by sport
-ice_hockey = [g for g in games_result.data if g['sport'] == 'Ice Hockey']
-football = [g for g in games_result.data if g['sport'] == 'Football']
+ice_hockey = [g for g in games if g['sport'] == 'Ice Hockey']
+football = [g for g in games if g['sport'] == 'Football']
 print(f'   - Ice Hockey: {len(ice_hockey)}')
 print(f'   - Football: {len(football)}')
 
 # Get odds count
-odds_result = supabase.table('odds').select('game_id', count='exact').execute()
-print(f'\n✅ Total odds: {odds_result.count}')
+odds_count = db.execute('SELECT COUNT(*) FROM odds').fetchone()[0]
+print(f'\n✅ Total odds: {odds_count}')
 
 # Average odds per game
-avg_odds = odds_result.count / games_result.count if games_result.count > 0 else 0
+avg_odds = odds_count / len(games) if len(games) > 0 else 0
 print(f'   - Average odds per game: {avg_odds:.0f}')
 
 # Sample games with odds
 print(f'\n📋 Sample games with odds:')
-for i, game in enumerate(games_result.data[:5]):
-    game_odds = supabase.table('odds').select('id', count='exact').eq('game_id', game['id']).execute()
+for i, game in enumerate(games[:5]):
+    game_odds = db.execute('SELECT COUNT(*) FROM odds WHERE game_id = ?', (game['id'],)).fetchone()[0]
     print(f'   {i+1}. {game["sport"]}: {game["match"][:50]}...')
-    print(f'      Odds: {game_odds.count}')
+    print(f'      Odds: {game_odds}')
 
 print(f'\n🎉 Database is ready for 4PLAY!')
 print("="*60)
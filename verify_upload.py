@@ -2,28 +2,25 @@ import sys
 import io
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
-from dotenv import load_dotenv
-import os
-from supabase import create_client
+from mirror import open_mirror
 
-load_dotenv()
-supabase = create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_SERVICE_KEY'))
+db = open_mirror()
 
 # Get all games
-games = supabase.table('games').select('id, sport, match').execute()
-print(f'\nTotal games in database: {len(games.data)}')
+games = db.execute('SELECT id, sport, match FROM games').fetchall()
+print(f'\nTotal games in database: {len(games)}')
 
 # Count by sport
-ice_hockey = [g for g in games.data if g['sport'] == 'Ice Hockey']
-football = [g for g in games.data if g['sport'] == 'Football']
+ice_hockey = [g for g in games if g['sport'] == 'Ice Hockey']
+football = [g for g in games if g['sport'] == 'Football']
 print(f'Ice Hockey games: {len(ice_hockey)}')
 print(f'Football games: {len(football)}')
 
 # Get odds count
-odds = supabase.table('odds').select('id').execute()
-print(f'\nTotal odds in database: {len(odds.data)}')
+odds_count = db.execute('SELECT COUNT(*) FROM odds').fetchone()[0]
+print(f'\nTotal odds in database: {odds_count}')
 
 # Sample games
 print(f'\nSample games:')
-for g in games.data[:5]:
+for g in games[:5]:
     print(f'  - {g["sport"]}: {g["match"]}')
@@ -1,8 +1,8 @@
 'use client'
 
-import { useEffect, useMemo, useState } from 'react'
+import { useEffect, useMemo, useRef, useState } from 'react'
 import { createClient } from '@/lib/supabase/client'
-import type { Game, Odd, SelectedPick } from '@/types/database.types'
+import type { Game, Odd, OddsChange, SelectedPick } from '@/types/database.types'
 import GameCard from '@/components/GameCard'
 import TicketBar from '@/components/TicketBar'
 import SportFilter from '@/components/SportFilter'
@@ -10,6 +10,9 @@ import GameMarketsModal from '@/components/GameMarketsModal'
 import { useRouter } from 'next/navigation'
 import type { User } from '@supabase/supabase-js'
 
+// How often to pull odds changes (price moves, suspensions, locks) after the initial load
+const ODDS_POLL_MS = 15000
+
 type Category = 'popular' | 'main' | 'goals' | 'handicaps' | 'players' | 'other'
 
 type Market = {
@@ -31,6 +34,8 @@ export default function HomePage() {
   const [marketsForGame, setMarketsForGame] = useState<Market[]>([])
   const [marketsGame, setMarketsGame] = useState<Game | null>(null)
   const [pinnedByGame, setPinnedByGame] = useState<Record<string, string[]>>({})
+  const lastSeqRef = useRef(0)
+  const pollingRef = useRef(false)
   const router = useRouter()
   const supabase = createClient()
 
@@ -97,6 +102,14 @@ export default function HomePage() {
       // Get today's date in YYYY-MM-DD format
       const today = new Date().toISOString().split('T')[0]
 
+      // Remember where the change feed is before taking the snapshot, so no change is missed
+      const { data: latestChange } = await supabase
+        .from('odds_changes')
+        .select('seq')
+        .order('seq', { ascending: false })
+        .limit(1)
+      lastSeqRef.current = latestChange?.[0]?.seq ?? 0
+
       // Fetch games for today
       const { data: gamesData, error: gamesError } = await supabase
         .from('games')
@@ -124,6 +137,7 @@ export default function HomePage() {
           const { data: oddsData, error: oddsError } = await supabase
             .from('odds')
             .select('*')
+            .eq('is_available', true)
             .range(from, from + RANGE_SIZE - 1)
 
           if (oddsError) {
@@ -166,6 +180,136 @@ export default function HomePage() {
     }
   }, [supabase, user])
 
+  // Apply odds changes from the feed instead of refetching the whole board
+  useEffect(() => {
+    if (!user || loading) return
+
+    const applyChanges = async (changes: OddsChange[]) => {
+      const today = new Date().toISOString().split('T')[0]
+
+      // New games come with their odds in one fetch; their 'added' rows are deduped below
+      const addedGameIds = changes.filter(c => c.change === 'game_added').map(c => c.game_id)
+      let newGames: Game[] = []
+      let newGameOdds: Odd[] = []
+      if (addedGameIds.length > 0) {
+        const { data: gamesData } = await supabase
+          .from('games')
+          .select('*')
+          .in('id', addedGameIds)
+          .eq('date', today)
+        newGames = gamesData || []
+
+        if (newGames.length > 0) {
+          const { data: oddsData } = await supabase
+            .from('odds')
+            .select('*')
+            .in('game_id', newGames.map(g => g.id))
+            .eq('is_available', true)
+          newGameOdds = oddsData || []
+        }
+      }
+
+      const lockChanges = new Map<string, boolean>()
+      changes.forEach(c => {
+        if (c.change === 'locked' || c.change === 'unlocked') {
+          lockChanges.set(c.game_id, c.change === 'unlocked')
+        }
+      })
+
+      setGames(prev => {
+        const known = new Set(prev.map(g => g.id))
+        return [...prev, ...newGames.filter(g => !known.has(g.id))]
+          .map(g => (lockChanges.has(g.id) ? { ...g, is_available: lockChanges.get(g.id)! } : g))
+          .sort((a, b) => a.time.localeCompare(b.time))
+      })
+
+      // Latest state of every changed odd, in feed order
+      const removed = new Set<string>()
+      const upserted = new Map<string, Odd>()
+      newGameOdds.forEach(odd => upserted.set(odd.id, odd))
+      changes.forEach(c => {
+        if (!c.odds_id) return
+        if (c.change === 'suspended') {
+          upserted.delete(c.odds_id)
+          removed.add(c.odds_id)
+          return
+        }
+        removed.delete(c.odds_id)
+        upserted.set(c.odds_id, {
+          id: c.odds_id,
+          game_id: c.game_id,
+          market: c.market!,
+          option: c.option!,
+          odd: Number(c.odd),
+          is_available: true,
+          created_at: c.created_at
+        })
+      })
+
+      setOdds(prev => {
+        const next: Record<string, Odd[]> = {}
+        Object.entries(prev).forEach(([gameId, gameOdds]) => {
+          next[gameId] = gameOdds
+            .filter(o => !removed.has(o.id))
+            .map(o => upserted.get(o.id) ?? o)
+        })
+        upserted.forEach(odd => {
+          const gameOdds = next[odd.game_id] || []
+          if (!gameOdds.some(o => o.id === odd.id)) {
+            next[odd.game_id] = [...gameOdds, odd]
+          }
+        })
+        return next
+      })
+
+      // Picks on suspended odds or locked games are dropped; repriced picks show the new odd
+      setSelectedPicks(prev => prev
+        .filter(p => !removed.has(p.odd.id) && lockChanges.get(p.game.id) !== false)
+        .map(p => {
+          const odd = upserted.get(p.odd.id)
+          return odd ? { ...p, odd } : p
+        }))
+    }
+
+    const pollChanges = async () => {
+      if (pollingRef.current) return
+      pollingRef.current = true
+      try {
+        // Page through the backlog (a resync can write thousands of changes) and apply it in one go
+        const changes: OddsChange[] = []
+        const FEED_PAGE_SIZE = 1000
+        let hasMore = true
+
+        while (hasMore) {
+          const { data, error } = await supabase
+            .from('odds_changes')
+            .select('*')
+            .gt('seq', changes.length > 0 ? changes[changes.length - 1].seq : lastSeqRef.current)
+            .order('seq', { ascending: true })
+            .limit(FEED_PAGE_SIZE)
+
+          if (error) {
+            console.error('Error fetching odds changes:', error)
+            break
+          }
+
+          changes.push(...(data || []))
+          hasMore = (data?.length ?? 0) === FEED_PAGE_SIZE
+        }
+
+        if (changes.length > 0) {
+          lastSeqRef.current = changes[changes.length - 1].seq
+          await applyChanges(changes)
+        }
+      } finally {
+        pollingRef.current = false
+      }
+    }
+
+    const interval = setInterval(pollChanges, ODDS_POLL_MS)
+    return () => clearInterval(interval)
+  }, [supabase, user, loading])
+
   const handleSelectPick = (pick: SelectedPick) => {
     const existingPick = selectedPicks.find(p => p.game.event_id === pick.game.event_id)
 
@@ -73,7 +73,7 @@ export default function ProfilePage() {
     won: parlays.filter(p => p.status === 'won').length,
     lost: parlays.filter(p => p.status === 'lost').length,
     winRate: parlays.length > 0
-      ? ((parlays.filter(p => p.status === 'won').length / (parlays.filter(p => p.status !== 'pending').length || 1)) * 100).toFixed(1)
+      ? ((parlays.filter(p => p.status === 'won').length / (parlays.filter(p => p.status === 'won' || p.status === 'lost').length || 1)) * 100).toFixed(1)
       : '0.0'
   }
 
@@ -208,6 +208,7 @@ export default function ProfilePage() {
                   <span className={`px-3 py-1 rounded-full text-xs font-semibold ${
                     parlay.status === 'won' ? 'bg-green-500/20 text-green-400' :
                     parlay.status === 'lost' ? 'bg-red-500/20 text-red-400' :
+                    parlay.status === 'void' ? 'bg-slate-500/20 text-slate-400' :
                     'bg-yellow-500/20 text-yellow-400'
                   }`}>
                     {parlay.status.toUpperCase()}
@@ -235,9 +236,11 @@ export default function ProfilePage() {
                         </span>
                         {pick.result && pick.result !== 'pending' && (
                           <span className={`text-xs font-semibold ${
-                            pick.result === 'won' ? 'text-green-400' : 'text-red-400'
+                            pick.result === 'won' ? 'text-green-400' :
+                            pick.result === 'void' ? 'text-slate-400' :
+                            'text-red-400'
                           }`}>
-                            {pick.result === 'won' ? '✓' : '✗'}
+                            {pick.result === 'won' ? '✓' : pick.result === 'void' ? '↺' : '✗'}
                           </span>
                         )}
                       </div>
@@ -37,36 +37,13 @@ export default function ParlayBuilder({ picks, onRemovePick, onClearAll }: Parla
         return
       }
 
-      // Create parlay (ticket)
-      const { data: parlay, error: parlayError } = await supabase
-        .from('parlays')
-        .insert({
-          user_id: user.id,
-          status: 'pending',
-          total_odds: totalOdds,
-        })
-        .select()
-        .single()
-
-      if (parlayError) throw parlayError
-
-      // Create parlay picks - include event_id and odds_id
-      const pickData = picks.map(pick => ({
-        parlay_id: parlay.id,
-        game_id: pick.game.id,
-        event_id: pick.game.event_id,
-        odds_id: pick.odd.id, // Add odds_id to fix null constraint error
-        market: pick.odd.market,
-        option: pick.odd.option,
-        odd: pick.odd.odd,
-        result: 'pending',
-      }))
-
-      const { error: picksError } = await supabase
-        .from('parlay_picks')
-        .insert(pickData)
-
-      if (picksError) throw picksError
+      // Create parlay (ticket) and its picks in one atomic call.
+      // The database validates the picks and computes total odds.
+      const { error: submitError } = await supabase.rpc('submit_parlay', {
+        pick_odds_ids: picks.map(pick => pick.odd.id),
+      })
+
+      if (submitError) throw submitError
 
       // Success! Show animation
       setShowSuccess(true)
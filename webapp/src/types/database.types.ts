@@ -17,6 +17,18 @@ export interface Odd {
   market: string
   option: string
   odd: number
+  is_available: boolean
+  created_at: string
+}
+
+export interface OddsChange {
+  seq: number
+  game_id: string
+  odds_id: string | null
+  change: 'game_added' | 'locked' | 'unlocked' | 'added' | 'price' | 'suspended' | 'resumed'
+  market: string | null
+  option: string | null
+  odd: number | null
   created_at: string
 }
 
@@ -27,7 +39,7 @@ export interface GameWithOdds extends Game {
 export interface Parlay {
   id: string
   user_id: string
-  status: 'pending' | 'won' | 'lost'
+  status: 'pending' | 'won' | 'lost' | 'void'
   total_odds: number
   created_at: string
 }
@@ -39,7 +51,7 @@ export interface ParlayPick {
   market: string
   option: string
   odd: number
-  result: 'won' | 'lost' | 'pending' | null
+  result: 'won' | 'lost' | 'void' | 'pending' | null
   created_at: string
 }
 